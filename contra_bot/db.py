@@ -7,17 +7,23 @@ Tables
   signals        – every trade signal extracted by the LLM
   trades         – every order submitted to Alpaca (open or closed)
   pending_orders – stock orders queued for next market open
+  llm_cache      – raw Claude responses keyed by prompt hash
 
-All operations use thread-local connections so multiple threads can share
+Writes are serialised through a single writer thread (started by init_db);
+reads use thread-local read-only connections, so multiple threads can share
 this module safely without connection contention.
 """
 
+import queue
 import sqlite3
 import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple
 
 from logger import get_logger
 
@@ -26,106 +32,432 @@ logger = get_logger(__name__)
 DB_PATH = Path("contra_bot.db")
 _local = threading.local()
 
+# Recently seen post_ids, checked before hitting SQLite in is_post_processed()
+_RECENT_CAP = 4096
+_recent_post_ids: "OrderedDict[str, None]" = OrderedDict()
+_recent_lock = threading.Lock()
 
-# ─── Connection management ────────────────────────────────────────────────────
 
-def _get_connection() -> sqlite3.Connection:
-    if not hasattr(_local, "conn") or _local.conn is None:
-        conn = sqlite3.connect(str(DB_PATH), detect_types=sqlite3.PARSE_DECLTYPES)
-        conn.row_factory = sqlite3.Row
+# ─── SQL statements ───────────────────────────────────────────────────────────
+# Hoisted to module constants so sqlite3's per-connection statement cache
+# always hits instead of re-preparing a fresh literal on every call.
+
+_SQL_INSERT_POST = """
+    INSERT OR IGNORE INTO posts
+        (subreddit, post_id, title, body, author, created_utc, upvotes, awards,
+         processed_at, filter_passed, filter_reason)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_POST_EXISTS = "SELECT EXISTS(SELECT 1 FROM posts WHERE post_id = ? LIMIT 1)"
+
+# Bound parameters per IN (...) lookup; well under SQLite's variable limit
+_IN_CHUNK = 500
+
+_SQL_INSERT_SIGNAL = """
+    INSERT INTO signals
+        (post_id, ticker, asset_type, raw_direction, final_direction,
+         confidence, reasoning, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_RECENT_SIGNAL = """
+    SELECT EXISTS(
+        SELECT 1 FROM signals
+        WHERE ticker = ?
+          AND created_at > ?
+        LIMIT 1
+    )
+"""
+
+_SQL_INSERT_TRADE = """
+    INSERT INTO trades
+        (signal_id, alpaca_order_id, ticker, direction, asset_type,
+         qty, entry_price, status, opened_at, opened_at_epoch)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_OPEN_TRADES = "SELECT * FROM trades WHERE status = 'open' ORDER BY opened_at DESC"
+
+_SQL_OPEN_TRADE_FOR_TICKER = "SELECT * FROM trades WHERE ticker = ? AND status = 'open'"
+
+_SQL_UPDATE_TRADE_PRICE = "UPDATE trades SET current_price = ?, pnl = ? WHERE id = ?"
+
+_SQL_SET_ENTRY_PRICE = "UPDATE trades SET entry_price = ? WHERE alpaca_order_id = ?"
+
+_SQL_CLOSE_TRADE = """
+    UPDATE trades
+    SET status = 'closed', closed_at = ?, current_price = ?, pnl = ?
+    WHERE id = ?
+"""
+
+_SQL_PREFLIGHT_OPEN = """
+    SELECT
+        (SELECT id FROM trades WHERE ticker = ? AND status = 'open' LIMIT 1) AS existing_id,
+        EXISTS(
+            SELECT 1 FROM signals WHERE ticker = ? AND created_at > ? LIMIT 1
+        ) AS recent_signal,
+        (SELECT COUNT(*) FROM trades WHERE status = 'open') AS open_count
+"""
+
+_SQL_TOTAL_PNL = "SELECT COALESCE(SUM(pnl), 0.0) FROM trades WHERE status = 'closed'"
+
+_SQL_COUNT_OPEN = "SELECT COUNT(*) FROM trades WHERE status = 'open'"
+
+_SQL_INSERT_PENDING = """
+    INSERT INTO pending_orders (signal_id, ticker, direction, qty, asset_type, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_PENDING_ORDERS = "SELECT * FROM pending_orders ORDER BY created_at ASC"
+
+_SQL_DELETE_PENDING = "DELETE FROM pending_orders WHERE id = ?"
+
+_SQL_GET_LLM_CACHE = "SELECT response FROM llm_cache WHERE hash = ? AND created_at > ?"
+
+_SQL_PUT_LLM_CACHE = """
+    INSERT OR REPLACE INTO llm_cache (hash, response, created_at) VALUES (?, ?, ?)
+"""
+
+_SQL_PRUNE_LLM_CACHE = "DELETE FROM llm_cache WHERE created_at <= ?"
+
+_SQL_DELETE_LLM_CACHE = "DELETE FROM llm_cache WHERE hash = ?"
+
+# Cached Claude responses older than this are ignored and pruned at startup
+_LLM_CACHE_TTL_DAYS = 30
+
+
+# ─── Timestamps ───────────────────────────────────────────────────────────────
+# Stored as naive UTC ISO strings (datetime.utcnow().isoformat() format).
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _iso_utc(t: float) -> str:
+    """Naive UTC ISO timestamp for unix time *t*."""
+    return (_EPOCH + timedelta(seconds=t)).isoformat()
+
+
+def _now_iso() -> str:
+    return datetime.utcnow().isoformat()
+
+
+# ─── Connection management ────────────────────────────────────────────────────
+#
+# Writes go through one writer thread that owns the only read-write
+# connection outside transaction() blocks; it drains queued operations in
+# batches and commits each batch once.  Reads use per-thread read-only
+# connections, which WAL lets run alongside the writer.  A transaction()
+# block keeps its reads and writes on the calling thread's own read-write
+# connection so it sees its own uncommitted rows and commits atomically.
+
+_WRITE_BATCH = 64
+_write_queue: "queue.Queue[Tuple[Callable[[sqlite3.Connection], Any], Future]]" = queue.Queue()
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _open(uri: str, read_only: bool) -> sqlite3.Connection:
+    # isolation_level=None: no implicit BEGINs — the writer, get_db() and
+    # transaction() issue BEGIN/COMMIT themselves.  No detect_types: the schema
+    # only uses INTEGER/REAL/TEXT, so per-column converter lookups are waste.
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        isolation_level=None,
+        check_same_thread=False,  # still one connection per thread via _local
+        cached_statements=256,
+    )
+    conn.row_factory = sqlite3.Row
+    if not read_only:
         conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL is durable across app crashes; skips the fsync per COMMIT
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA journal_size_limit=6144000")
         conn.execute("PRAGMA foreign_keys=ON")
-        conn.execute("PRAGMA busy_timeout=5000")
-        _local.conn = conn
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")        # 64 MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")      # 256 MB memory-mapped I/O
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def _get_connection() -> sqlite3.Connection:
+    """This thread's read-write connection (writer thread / transaction())."""
+    if getattr(_local, "conn", None) is None:
+        _local.conn = _open(DB_PATH.resolve().as_uri(), read_only=False)
     return _local.conn
 
 
+def _get_read_connection() -> sqlite3.Connection:
+    """This thread's read-only connection."""
+    if getattr(_local, "ro_conn", None) is None:
+        _local.ro_conn = _open(f"{DB_PATH.resolve().as_uri()}?mode=ro", read_only=True)
+    return _local.ro_conn
+
+
 @contextmanager
 def get_db() -> Generator[sqlite3.Connection, None, None]:
+    """Connection for reads: the open transaction's if any, else read-only."""
+    if getattr(_local, "txn_depth", 0):
+        yield _local.conn
+    else:
+        yield _get_read_connection()
+
+
+def _write(op: Callable[[sqlite3.Connection], Any]) -> Any:
+    """
+    Run *op(conn)* as a write and return its result once committed.
+    Joins the caller's transaction() if one is open; otherwise the op is
+    queued for the writer thread (or run inline before init_db() starts it).
+    """
+    if getattr(_local, "txn_depth", 0):
+        return op(_local.conn)
+    if _writer_thread is None:
+        conn = _get_connection()
+        conn.execute("BEGIN")
+        try:
+            result = op(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return result
+    future: Future = Future()
+    _write_queue.put((op, future))
+    return future.result()
+
+
+def _writer_loop() -> None:
+    conn = _get_connection()
+    while True:
+        batch = [_write_queue.get()]
+        while len(batch) < _WRITE_BATCH:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        outcomes: List[Tuple[Future, bool, Any]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, future in batch:
+                # A savepoint per op so one failure doesn't sink the batch
+                conn.execute("SAVEPOINT op")
+                try:
+                    outcomes.append((future, True, op(conn)))
+                    conn.execute("RELEASE op")
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO op")
+                    conn.execute("RELEASE op")
+                    outcomes.append((future, False, exc))
+            conn.commit()
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("DB writer batch of %d failed: %s", len(batch), exc)
+            outcomes = [(future, False, exc) for _, future in batch]
+
+        # Only report back after COMMIT so callers never read stale rows
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+def _start_writer() -> None:
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None:
+            thread = threading.Thread(target=_writer_loop, daemon=True, name="DBWriter")
+            thread.start()
+            _writer_thread = thread
+
+
+@contextmanager
+def transaction() -> Generator[sqlite3.Connection, None, None]:
+    """
+    Group every db write made inside the block into a single
+    BEGIN IMMEDIATE … COMMIT on this thread's connection, so a burst of
+    writes costs one commit.  Nested transaction() blocks join the outermost.
+    """
     conn = _get_connection()
+    depth = getattr(_local, "txn_depth", 0)
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+        _local.on_commit = []
+    _local.txn_depth = depth + 1
     try:
         yield conn
-        conn.commit()
+        if depth == 0:
+            conn.commit()
     except Exception:
-        conn.rollback()
+        if depth == 0:
+            conn.rollback()
         raise
+    finally:
+        _local.txn_depth = depth
+        if depth == 0:
+            hooks, _local.on_commit = _local.on_commit, []
+    # Only reached once the outermost block has committed
+    if depth == 0:
+        for hook in hooks:
+            hook()
+
+
+def _after_commit(hook: Callable[[], None]) -> None:
+    """
+    Run *hook* once the caller's writes are committed: after the outermost
+    transaction() if one is open (dropped if it rolls back), else right away.
+    """
+    if getattr(_local, "txn_depth", 0):
+        _local.on_commit.append(hook)
+    else:
+        hook()
 
 
 # ─── Schema initialisation ────────────────────────────────────────────────────
 
 def init_db() -> None:
-    with get_db() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS posts (
-                id           INTEGER PRIMARY KEY AUTOINCREMENT,
-                subreddit    TEXT    NOT NULL,
-                post_id      TEXT    NOT NULL UNIQUE,
-                title        TEXT,
-                body         TEXT,
-                author       TEXT,
-                created_utc  REAL,
-                upvotes      INTEGER DEFAULT 0,
-                awards       INTEGER DEFAULT 0,
-                processed_at TEXT,
-                filter_passed INTEGER,
-                filter_reason TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS signals (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id         TEXT NOT NULL,
-                ticker          TEXT NOT NULL,
-                asset_type      TEXT,
-                raw_direction   TEXT,
-                final_direction TEXT,
-                confidence      REAL,
-                reasoning       TEXT,
-                created_at      TEXT,
-                FOREIGN KEY (post_id) REFERENCES posts(post_id)
-            );
-
-            CREATE TABLE IF NOT EXISTS trades (
-                id               INTEGER PRIMARY KEY AUTOINCREMENT,
-                signal_id        INTEGER,
-                alpaca_order_id  TEXT,
-                ticker           TEXT NOT NULL,
-                direction        TEXT,
-                asset_type       TEXT,
-                qty              REAL,
-                entry_price      REAL,
-                current_price    REAL,
-                status           TEXT DEFAULT 'open',
-                opened_at        TEXT,
-                closed_at        TEXT,
-                pnl              REAL,
-                FOREIGN KEY (signal_id) REFERENCES signals(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS pending_orders (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                signal_id   INTEGER,
-                ticker      TEXT NOT NULL,
-                direction   TEXT,
-                qty         REAL,
-                asset_type  TEXT,
-                created_at  TEXT,
-                FOREIGN KEY (signal_id) REFERENCES signals(id)
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_posts_post_id   ON posts(post_id);
-            CREATE INDEX IF NOT EXISTS idx_signals_ticker  ON signals(ticker);
-            CREATE INDEX IF NOT EXISTS idx_trades_ticker   ON trades(ticker);
-            CREATE INDEX IF NOT EXISTS idx_trades_status   ON trades(status);
-        """)
+    conn = _get_connection()
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS posts (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            subreddit    TEXT    NOT NULL,
+            post_id      TEXT    NOT NULL UNIQUE,
+            title        TEXT,
+            body         TEXT,
+            author       TEXT,
+            created_utc  REAL,
+            upvotes      INTEGER DEFAULT 0,
+            awards       INTEGER DEFAULT 0,
+            processed_at TEXT,
+            filter_passed INTEGER,
+            filter_reason TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS signals (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id         TEXT NOT NULL,
+            ticker          TEXT NOT NULL,
+            asset_type      TEXT,
+            raw_direction   TEXT,
+            final_direction TEXT,
+            confidence      REAL,
+            reasoning       TEXT,
+            created_at      TEXT,
+            FOREIGN KEY (post_id) REFERENCES posts(post_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS trades (
+            id               INTEGER PRIMARY KEY AUTOINCREMENT,
+            signal_id        INTEGER,
+            alpaca_order_id  TEXT,
+            ticker           TEXT NOT NULL,
+            direction        TEXT,
+            asset_type       TEXT,
+            qty              REAL,
+            entry_price      REAL,
+            current_price    REAL,
+            status           TEXT DEFAULT 'open',
+            opened_at        TEXT,
+            opened_at_epoch  INTEGER,
+            closed_at        TEXT,
+            pnl              REAL,
+            FOREIGN KEY (signal_id) REFERENCES signals(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS pending_orders (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            signal_id   INTEGER,
+            ticker      TEXT NOT NULL,
+            direction   TEXT,
+            qty         REAL,
+            asset_type  TEXT,
+            created_at  TEXT,
+            FOREIGN KEY (signal_id) REFERENCES signals(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            hash        TEXT PRIMARY KEY,
+            response    TEXT NOT NULL,
+            created_at  TEXT NOT NULL
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_posts_post_id   ON posts(post_id);
+
+        -- Composite indexes matching the hot-path predicates; they
+        -- supersede the old single-column ticker/status indexes.
+        DROP INDEX IF EXISTS idx_signals_ticker;
+        DROP INDEX IF EXISTS idx_trades_ticker;
+        DROP INDEX IF EXISTS idx_trades_status;
+        CREATE INDEX IF NOT EXISTS idx_signals_ticker_created ON signals(ticker, created_at);
+        CREATE INDEX IF NOT EXISTS idx_trades_ticker_status   ON trades(ticker, status);
+        CREATE INDEX IF NOT EXISTS idx_trades_status_opened   ON trades(status, opened_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_pending_orders_created ON pending_orders(created_at);
+    """)
+    _migrate_trades_opened_at_epoch(conn)
+    conn.execute(_SQL_PRUNE_LLM_CACHE, (_llm_cache_cutoff(),))
+    # Refresh planner statistics so the composite indexes get picked
+    conn.execute("ANALYZE")
+    _start_writer()
     logger.info("Database initialised at %s", DB_PATH)
 
 
+def _migrate_trades_opened_at_epoch(conn: sqlite3.Connection) -> None:
+    """Add trades.opened_at_epoch to databases created before it existed."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(trades)")}
+    if "opened_at_epoch" in columns:
+        return
+    conn.execute("ALTER TABLE trades ADD COLUMN opened_at_epoch INTEGER")
+    conn.execute("""
+        UPDATE trades SET opened_at_epoch = CAST(strftime('%s', opened_at) AS INTEGER)
+        WHERE opened_at IS NOT NULL
+    """)
+    logger.info("Migrated trades table: added opened_at_epoch")
+
+
 # ─── Post operations ──────────────────────────────────────────────────────────
 
+def _remember_post_ids(post_ids: List[str]) -> None:
+    with _recent_lock:
+        for post_id in post_ids:
+            _recent_post_ids[post_id] = None
+            _recent_post_ids.move_to_end(post_id)
+        while len(_recent_post_ids) > _RECENT_CAP:
+            _recent_post_ids.popitem(last=False)
+
+
 def is_post_processed(post_id: str) -> bool:
+    with _recent_lock:
+        if post_id in _recent_post_ids:
+            return True
+    with get_db() as conn:
+        cur = conn.execute(_SQL_POST_EXISTS, (post_id,))
+        processed = bool(cur.fetchone()[0])
+    if processed:
+        _remember_post_ids([post_id])
+    return processed
+
+
+def get_processed_post_ids(post_ids: List[str]) -> Set[str]:
+    """Return the subset of *post_ids* already stored, in one query per 500 ids."""
+    with _recent_lock:
+        seen = {post_id for post_id in post_ids if post_id in _recent_post_ids}
+    misses = [post_id for post_id in post_ids if post_id not in seen]
+    found: List[str] = []
     with get_db() as conn:
-        cur = conn.execute("SELECT 1 FROM posts WHERE post_id = ?", (post_id,))
-        return cur.fetchone() is not None
+        for i in range(0, len(misses), _IN_CHUNK):
+            chunk = misses[i:i + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cur = conn.execute(
+                f"SELECT post_id FROM posts WHERE post_id IN ({placeholders})", chunk
+            )
+            found.extend(row[0] for row in cur.fetchall())
+    if found:
+        _remember_post_ids(found)
+    return seen.union(found)
 
 
 def save_post(
@@ -140,19 +472,26 @@ def save_post(
     filter_passed: bool,
     filter_reason: str,
 ) -> None:
-    with get_db() as conn:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO posts
-                (subreddit, post_id, title, body, author, created_utc, upvotes, awards,
-                 processed_at, filter_passed, filter_reason)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                subreddit, post_id, title, body, author, created_utc, upvotes, awards,
-                datetime.utcnow().isoformat(), int(filter_passed), filter_reason,
-            ),
-        )
+    params = (
+        subreddit, post_id, title, body, author, created_utc, upvotes, awards,
+        _now_iso(), int(filter_passed), filter_reason,
+    )
+    _write(lambda conn: conn.execute(_SQL_INSERT_POST, params))
+    _after_commit(lambda: _remember_post_ids([post_id]))
+
+
+def save_posts_many(rows: List[Tuple[Any, ...]]) -> None:
+    """
+    Insert many posts with one executemany().  Each row holds the save_post()
+    arguments in order: (subreddit, post_id, title, body, author, created_utc,
+    upvotes, awards, filter_passed, filter_reason).
+    """
+    if not rows:
+        return
+    processed_at = _now_iso()
+    params = [(*row[:8], processed_at, int(row[8]), row[9]) for row in rows]
+    _write(lambda conn: conn.executemany(_SQL_INSERT_POST, params))
+    _after_commit(lambda: _remember_post_ids([row[1] for row in rows]))
 
 
 # ─── Signal operations ────────────────────────────────────────────────────────
@@ -166,34 +505,32 @@ def save_signal(
     confidence: float,
     reasoning: str,
 ) -> int:
-    with get_db() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO signals
-                (post_id, ticker, asset_type, raw_direction, final_direction,
-                 confidence, reasoning, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                post_id, ticker, asset_type, raw_direction, final_direction,
-                confidence, reasoning, datetime.utcnow().isoformat(),
-            ),
-        )
-        return cur.lastrowid
+    params = (
+        post_id, ticker, asset_type, raw_direction, final_direction,
+        confidence, reasoning, _now_iso(),
+    )
+    return _write(lambda conn: conn.execute(_SQL_INSERT_SIGNAL, params).lastrowid)
+
+
+def save_signals_many(rows: List[Tuple[Any, ...]]) -> None:
+    """
+    Insert many signals with one executemany().  Each row holds the
+    save_signal() arguments in order: (post_id, ticker, asset_type,
+    raw_direction, final_direction, confidence, reasoning).
+    """
+    if not rows:
+        return
+    created_at = _now_iso()
+    params = [(*row, created_at) for row in rows]
+    _write(lambda conn: conn.executemany(_SQL_INSERT_SIGNAL, params))
 
 
 def has_recent_signal_for_ticker(ticker: str, hours: int = 24) -> bool:
     """True if we already generated a signal for this ticker in the last *hours* hours."""
     with get_db() as conn:
-        cur = conn.execute(
-            """
-            SELECT 1 FROM signals
-            WHERE ticker = ?
-              AND created_at > datetime('now', ? || ' hours')
-            """,
-            (ticker, f"-{hours}"),
-        )
-        return cur.fetchone() is not None
+        cutoff = _iso_utc(time.time() - hours * 3600)
+        cur = conn.execute(_SQL_RECENT_SIGNAL, (ticker, cutoff))
+        return bool(cur.fetchone()[0])
 
 
 # ─── Trade operations ─────────────────────────────────────────────────────────
@@ -208,66 +545,89 @@ def save_trade(
     entry_price: float,
     status: str = "open",
 ) -> int:
+    now = time.time()
+    params = (
+        signal_id, alpaca_order_id, ticker, direction, asset_type,
+        qty, entry_price, status, _iso_utc(now), int(now),
+    )
+    return _write(lambda conn: conn.execute(_SQL_INSERT_TRADE, params).lastrowid)
+
+
+def save_trades_bulk(rows: List[Tuple[Any, ...]]) -> None:
+    """
+    Insert many trades with one executemany().  Each row holds the save_trade()
+    arguments in order: (signal_id, alpaca_order_id, ticker, direction,
+    asset_type, qty, entry_price, status).
+    """
+    if not rows:
+        return
+    now = time.time()
+    opened_at, opened_at_epoch = _iso_utc(now), int(now)
+    params = [(*row, opened_at, opened_at_epoch) for row in rows]
+    _write(lambda conn: conn.executemany(_SQL_INSERT_TRADE, params))
+
+
+def get_open_trades() -> List[sqlite3.Row]:
     with get_db() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO trades
-                (signal_id, alpaca_order_id, ticker, direction, asset_type,
-                 qty, entry_price, status, opened_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                signal_id, alpaca_order_id, ticker, direction, asset_type,
-                qty, entry_price, status, datetime.utcnow().isoformat(),
-            ),
-        )
-        return cur.lastrowid
-
-
-def get_open_trades() -> List[Dict[str, Any]]:
-    with get_db() as conn:
-        cur = conn.execute("SELECT * FROM trades WHERE status = 'open' ORDER BY opened_at DESC")
-        return [dict(row) for row in cur.fetchall()]
+        cur = conn.execute(_SQL_OPEN_TRADES)
+        return cur.fetchall()
 
 
 def get_open_trade_for_ticker(ticker: str) -> Optional[Dict[str, Any]]:
     with get_db() as conn:
-        cur = conn.execute(
-            "SELECT * FROM trades WHERE ticker = ? AND status = 'open'", (ticker,)
-        )
+        cur = conn.execute(_SQL_OPEN_TRADE_FOR_TICKER, (ticker,))
         row = cur.fetchone()
         return dict(row) if row else None
 
 
 def update_trade_price(trade_id: int, current_price: float, pnl: float) -> None:
-    with get_db() as conn:
-        conn.execute(
-            "UPDATE trades SET current_price = ?, pnl = ? WHERE id = ?",
-            (current_price, pnl, trade_id),
-        )
+    update_trade_prices_bulk([(current_price, pnl, trade_id)])
+
+
+def update_trade_prices_bulk(rows: List[Tuple[float, float, int]]) -> None:
+    """Apply many (current_price, pnl, trade_id) updates in one commit."""
+    if not rows:
+        return
+    _write(lambda conn: conn.executemany(_SQL_UPDATE_TRADE_PRICE, rows))
+
+
+def set_trade_entry_price(alpaca_order_id: str, entry_price: float) -> int:
+    """Record the actual fill price of an order; returns the number of trades updated."""
+    params = (entry_price, alpaca_order_id)
+    return _write(lambda conn: conn.execute(_SQL_SET_ENTRY_PRICE, params).rowcount)
 
 
 def close_trade(trade_id: int, current_price: float, pnl: float) -> None:
+    params = (_now_iso(), current_price, pnl, trade_id)
+    _write(lambda conn: conn.execute(_SQL_CLOSE_TRADE, params))
+
+
+def preflight_open(ticker: str, hours: int = 24) -> Dict[str, Any]:
+    """
+    Everything maybe_open_position() checks, in one query:
+      existing_id   – id of an open trade in *ticker*, or None
+      recent_signal – True if *ticker* had a signal in the last *hours* hours
+      open_count    – number of open trades
+    """
+    cutoff = _iso_utc(time.time() - hours * 3600)
     with get_db() as conn:
-        conn.execute(
-            """
-            UPDATE trades
-            SET status = 'closed', closed_at = ?, current_price = ?, pnl = ?
-            WHERE id = ?
-            """,
-            (datetime.utcnow().isoformat(), current_price, pnl, trade_id),
-        )
+        row = conn.execute(_SQL_PREFLIGHT_OPEN, (ticker, ticker, cutoff)).fetchone()
+    return {
+        "existing_id": row["existing_id"],
+        "recent_signal": bool(row["recent_signal"]),
+        "open_count": int(row["open_count"]),
+    }
 
 
 def get_total_pnl() -> float:
     with get_db() as conn:
-        cur = conn.execute("SELECT COALESCE(SUM(pnl), 0.0) FROM trades WHERE status = 'closed'")
+        cur = conn.execute(_SQL_TOTAL_PNL)
         return float(cur.fetchone()[0])
 
 
 def count_open_positions() -> int:
     with get_db() as conn:
-        cur = conn.execute("SELECT COUNT(*) FROM trades WHERE status = 'open'")
+        cur = conn.execute(_SQL_COUNT_OPEN)
         return int(cur.fetchone()[0])
 
 
@@ -276,23 +636,53 @@ def count_open_positions() -> int:
 def save_pending_order(
     signal_id: int, ticker: str, direction: str, qty: float, asset_type: str
 ) -> int:
-    with get_db() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO pending_orders (signal_id, ticker, direction, qty, asset_type, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (signal_id, ticker, direction, qty, asset_type, datetime.utcnow().isoformat()),
-        )
-        return cur.lastrowid
+    params = (signal_id, ticker, direction, qty, asset_type, _now_iso())
+    return _write(lambda conn: conn.execute(_SQL_INSERT_PENDING, params).lastrowid)
 
 
-def get_pending_orders() -> List[Dict[str, Any]]:
+def get_pending_orders() -> List[sqlite3.Row]:
     with get_db() as conn:
-        cur = conn.execute("SELECT * FROM pending_orders ORDER BY created_at ASC")
-        return [dict(row) for row in cur.fetchall()]
+        cur = conn.execute(_SQL_PENDING_ORDERS)
+        return cur.fetchall()
 
 
 def delete_pending_order(order_id: int) -> None:
+    delete_pending_orders([order_id])
+
+
+def delete_pending_orders(order_ids: List[int]) -> None:
+    """Delete many pending orders in one commit."""
+    if not order_ids:
+        return
+    params = [(order_id,) for order_id in order_ids]
+    _write(lambda conn: conn.executemany(_SQL_DELETE_PENDING, params))
+
+
+# ─── LLM response cache ───────────────────────────────────────────────────────
+
+def _llm_cache_cutoff() -> str:
+    return _iso_utc(time.time() - _LLM_CACHE_TTL_DAYS * 86400)
+
+
+def get_llm_cache(key: str) -> Optional[str]:
+    """Return the cached response for prompt hash *key*, unless missing or expired."""
     with get_db() as conn:
-        conn.execute("DELETE FROM pending_orders WHERE id = ?", (order_id,))
+        row = conn.execute(_SQL_GET_LLM_CACHE, (key, _llm_cache_cutoff())).fetchone()
+    return row[0] if row else None
+
+
+def put_llm_cache(key: str, response: str) -> None:
+    put_llm_cache_many([(key, response)])
+
+
+def put_llm_cache_many(rows: List[Tuple[str, str]]) -> None:
+    """Store many (key, response) pairs in one commit."""
+    if not rows:
+        return
+    created_at = _now_iso()
+    params = [(key, response, created_at) for key, response in rows]
+    _write(lambda conn: conn.executemany(_SQL_PUT_LLM_CACHE, params))
+
+
+def delete_llm_cache(key: str) -> None:
+    _write(lambda conn: conn.execute(_SQL_DELETE_LLM_CACHE, (key,)))
@@ -6,11 +6,18 @@ Filters run cheaply (no API calls) to reduce cost and latency.
 """
 
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Any
+from itertools import accumulate
+from typing import Any, List, Optional
 
 from logger import get_logger
 
+try:
+    import ahocorasick  # pyahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
 # ─── Sports / gambling vocabulary ─────────────────────────────────────────────
@@ -34,6 +41,54 @@ _SPORTS_KEYWORDS: frozenset[str] = frozenset(
     }
 )
 
+# Every sports keyword is matched in one pass over the text: an Aho–Corasick
+# automaton when pyahocorasick is installed, otherwise one regex alternation.
+if ahocorasick is not None:
+    _SPORTS_AC = ahocorasick.Automaton()
+    for _kw in _SPORTS_KEYWORDS:
+        _SPORTS_AC.add_word(_kw, _kw)
+    _SPORTS_AC.make_automaton()
+    _SPORTS_RE = None
+else:
+    _SPORTS_AC = None
+    _SPORTS_RE = re.compile(
+        "|".join(re.escape(kw) for kw in sorted(_SPORTS_KEYWORDS, key=len, reverse=True))
+    )
+
+
+def _find_sports_keyword(text_lower: str) -> Optional[str]:
+    """Return the first sports/gambling keyword found in *text_lower*, if any."""
+    if _SPORTS_AC is not None:
+        for _, keyword in _SPORTS_AC.iter(text_lower):
+            return keyword
+        return None
+    match = _SPORTS_RE.search(text_lower)
+    return match.group() if match else None
+
+
+def _find_sports_keywords_batch(texts_lower: List[str]) -> List[Optional[str]]:
+    """
+    Batch form of _find_sports_keyword(): the texts are joined with NUL
+    separators and scanned in a single pass, then each match is mapped back
+    to its text by offset.  Returns the first keyword per text (or None).
+    """
+    found: List[Optional[str]] = [None] * len(texts_lower)
+    if not texts_lower:
+        return found
+    joined = "\x00".join(texts_lower)
+    # ends[i] is the offset just past text i's separator, i.e. where i+1 starts
+    ends = list(accumulate(len(t) + 1 for t in texts_lower))
+    if _SPORTS_AC is not None:
+        matches = _SPORTS_AC.iter(joined)  # yields (index of last char, keyword)
+    else:
+        matches = ((m.end() - 1, m.group()) for m in _SPORTS_RE.finditer(joined))
+    for last_idx, keyword in matches:
+        i = bisect_right(ends, last_idx)
+        if found[i] is None:
+            found[i] = keyword
+    return found
+
+
 # ─── Common crypto names so we can recognise them as valid instruments ────────
 _CRYPTO_NAMES: frozenset[str] = frozenset(
     {
@@ -46,16 +101,35 @@ _CRYPTO_NAMES: frozenset[str] = frozenset(
     }
 )
 
+# One alternation over every crypto name, matched against lower-cased text
+_CRYPTO_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(name) for name in _CRYPTO_NAMES) + r")\b"
+)
+
 # Ticker pattern: optional $, then 1–5 uppercase letters (stock-like)
 _TICKER_RE = re.compile(r"\$?[A-Z]{1,5}\b")
 
+# $TICKER pattern (e.g. $AAPL) — always counts as an instrument
+_DOLLAR_TICKER_RE = re.compile(r"\$[A-Z]{1,5}\b")
+
+# All-caps words that look like tickers but are common English / slang
+_STOP_WORDS: frozenset[str] = frozenset(
+    {
+        "I", "A", "AN", "THE", "AND", "OR", "BUT", "FOR", "NOR", "SO", "YET",
+        "AT", "BY", "IN", "OF", "ON", "TO", "UP", "AS", "IS", "IT", "BE",
+        "DO", "GO", "IF", "NO", "MY", "HE", "ME", "WE", "US", "AM", "VS",
+        "TV", "PC", "OK", "AI", "IT", "HQ", "DD", "TL", "DR", "IMO", "LOL",
+        "OMG", "WTF", "CEO", "CFO", "COO", "CTO", "SEC", "FED", "IPO",
+    }
+)
+
 # Image/media URL extensions that signal a meme / link post
 _IMAGE_EXTENSIONS = frozenset(
     {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".tiff", ".svg"}
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class FilterResult:
     passed: bool
     reason: str
@@ -65,33 +139,57 @@ class PostFilter:
     def __init__(self, config: dict) -> None:
         self._min_karma: int = int(config.get("min_author_karma", 100))
 
-    # ── Public entry point ────────────────────────────────────────────────────
+    # ── Public entry points ───────────────────────────────────────────────────
 
     def filter(self, post: Any) -> FilterResult:
         """
         Run all filters against *post* (a PostData instance).
         Returns a FilterResult with passed=True only when every check passes.
         """
-        checks = [
-            self._check_sports,
-            self._check_meme,
-            self._check_financial_instrument,
-            self._check_author_karma,
+        # Build the combined text once; the text checks share it
+        combined = f"{post.title}\n{post.body or ''}"
+        combined_lower = combined.lower()
+        return self._run_checks(
+            post, combined, combined_lower, _find_sports_keyword(combined_lower)
+        )
+
+    def filter_batch(self, posts: List[Any]) -> List[FilterResult]:
+        """
+        Filter a whole poll's worth of posts.  Same results as calling
+        filter() on each, but the sports vocabulary is scanned once across
+        the batch rather than once per post.
+        """
+        texts = [f"{post.title}\n{post.body or ''}" for post in posts]
+        texts_lower = [text.lower() for text in texts]
+        keywords = _find_sports_keywords_batch(texts_lower)
+        return [
+            self._run_checks(post, combined, combined_lower, keyword)
+            for post, combined, combined_lower, keyword
+            in zip(posts, texts, texts_lower, keywords)
         ]
-        for check in checks:
-            result = check(post)
-            if not result.passed:
-                return result
+
+    def _run_checks(
+        self, post: Any, combined: str, combined_lower: str, sports_keyword: Optional[str]
+    ) -> FilterResult:
+        # Same order as before, first failure wins; called directly so no
+        # (check, args) table is rebuilt for every post
+        result = self._check_sports(sports_keyword)
+        if result.passed:
+            result = self._check_meme(post)
+        if result.passed:
+            result = self._check_financial_instrument(combined, combined_lower)
+        if result.passed:
+            result = self._check_author_karma(post)
+        if not result.passed:
+            return result
         return FilterResult(passed=True, reason="all checks passed")
 
     # ── Individual filter checks ──────────────────────────────────────────────
 
     @staticmethod
-    def _check_sports(post: Any) -> FilterResult:
-        combined = f"{post.title} {post.body}".lower()
-        for keyword in _SPORTS_KEYWORDS:
-            if keyword in combined:
-                return FilterResult(passed=False, reason=f"sports/gambling keyword: '{keyword}'")
+    def _check_sports(keyword: Optional[str]) -> FilterResult:
+        if keyword is not None:
+            return FilterResult(passed=False, reason=f"sports/gambling keyword: '{keyword}'")
         return FilterResult(passed=True, reason="no sports keywords")
 
     @staticmethod
@@ -113,9 +211,8 @@ class PostFilter:
         return FilterResult(passed=True, reason="not a meme post")
 
     @staticmethod
-    def _check_financial_instrument(post: Any) -> FilterResult:
-        combined = f"{post.title} {post.body}"
-        if _has_instrument_in_text(combined):
+    def _check_financial_instrument(combined: str, combined_lower: str) -> FilterResult:
+        if _has_instrument_in_text(combined, combined_lower):
             return FilterResult(passed=True, reason="financial instrument found")
         return FilterResult(passed=False, reason="no identifiable financial instrument")
 
@@ -134,35 +231,30 @@ class PostFilter:
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
-def _has_instrument_in_text(text: str) -> bool:
+def _has_instrument_in_text(text: str, text_lower: Optional[str] = None) -> bool:
     """
     Return True if the text contains at least one recognisable financial instrument:
       - A $TICKER pattern (e.g. $AAPL, $GME)
       - A bare all-caps ticker of 1–5 letters that isn't a common English stop-word
       - A known crypto name or symbol
+    Pass *text_lower* when the caller already has it to skip re-lowering.
     """
-    text_lower = text.lower()
+    if text_lower is None:
+        text_lower = text.lower()
+
     # Quick crypto name check
-    for name in _CRYPTO_NAMES:
-        if re.search(r"\b" + re.escape(name) + r"\b", text_lower):
-            return True
+    if _CRYPTO_RE.search(text_lower):
+        return True
 
     # $TICKER always counts
-    if re.search(r"\$[A-Z]{1,5}\b", text):
+    if _DOLLAR_TICKER_RE.search(text):
         return True
 
     # Bare uppercase 2-5 letter word that is not a common stop-word
-    _STOP_WORDS = frozenset(
-        {
-            "I", "A", "AN", "THE", "AND", "OR", "BUT", "FOR", "NOR", "SO", "YET",
-            "AT", "BY", "IN", "OF", "ON", "TO", "UP", "AS", "IS", "IT", "BE",
-            "DO", "GO", "IF", "NO", "MY", "HE", "ME", "WE", "US", "AM", "VS",
-            "TV", "PC", "OK", "AI", "IT", "HQ", "DD", "TL", "DR", "IMO", "LOL",
-            "OMG", "WTF", "CEO", "CFO", "COO", "CTO", "SEC", "FED", "IPO",
-        }
-    )
     for match in _TICKER_RE.finditer(text):
-        word = match.group().lstrip("$")
+        word = match.group()
+        if word[0] == "$":
+            word = word[1:]
         if len(word) >= 2 and word not in _STOP_WORDS:
             return True
 
@@ -2,19 +2,38 @@
 Structured logging: rotating file handler + Rich console handler.
 All project modules call get_logger(__name__) to obtain a child logger
 that inherits handlers from the root "contra_bot" logger.
+
+Both handlers sit behind a QueueHandler and are served by a background
+QueueListener thread, so a log call on the hot path is just a queue put.
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
 from pathlib import Path
+from typing import Optional
 
 from rich.logging import RichHandler
 
 _initialized = False
+_console_handler: Optional[logging.Handler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records untouched.  The queue never leaves
+    this process, so formatting (and Rich tracebacks via exc_info) can be
+    deferred to the listener thread instead of running on the caller's.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 def _setup_root_logger() -> None:
-    global _initialized
+    global _initialized, _console_handler, _listener
     if _initialized:
         return
     _initialized = True
@@ -49,8 +68,42 @@ def _setup_root_logger() -> None:
     )
     ch.setLevel(logging.INFO)
 
-    root.addHandler(fh)
-    root.addHandler(ch)
+    # ── Queue in front of both handlers ────────────────────────────────────
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_InProcessQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, fh, ch, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    _console_handler = ch
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread (safe to call twice)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def set_console_level(level: Optional[str]) -> None:
+    """
+    Change the Rich console threshold (e.g. "WARNING" in production).
+    The rotating file handler keeps full DEBUG detail regardless.
+    An unknown or missing level falls back to INFO with a warning.
+    """
+    _setup_root_logger()
+    # getLevelNamesMapping() is Python 3.11+
+    if hasattr(logging, "getLevelNamesMapping"):
+        names = logging.getLevelNamesMapping()
+    else:
+        names = logging._nameToLevel
+    name = str(level).upper() if level is not None else ""
+    if name not in names:
+        get_logger(__name__).warning(
+            "Unknown console_log_level %r — using INFO", level
+        )
+        name = "INFO"
+    _console_handler.setLevel(names[name])
 
 
 def get_logger(name: str) -> logging.Logger:
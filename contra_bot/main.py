@@ -18,11 +18,13 @@ Error handling
   continues running.  Unrecoverable startup errors exit with code 1.
 """
 
+import logging
 import signal as signal_module
 import sys
 import threading
 import time
 from pathlib import Path
+from typing import Optional, Tuple
 
 import yaml
 from dotenv import load_dotenv
@@ -32,13 +34,18 @@ from rich.panel import Panel
 from rich.table import Table
 
 import db
-from filters import PostFilter
-from logger import get_logger
+from filters import FilterResult, PostFilter
+from logger import get_logger, set_console_level, stop_logging
 from position_manager import PositionManager
 from reddit_monitor import RedditMonitor
 from signal_parser import SignalParser
 from trade_executor import TradeExecutor
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C parser
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = get_logger(__name__)
 console = Console()
 
@@ -51,11 +58,44 @@ def load_config(path: str = "config.yaml") -> dict:
         logger.error("config.yaml not found at %s", config_path.resolve())
         sys.exit(1)
     with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
 
 
 # ─── Rich dashboard ────────────────────────────────────────────────────────────
 
+# Config is fixed for the life of the process, so its table is built once
+_cfg_table_cache: Optional[Tuple[int, Table]] = None
+
+
+def _get_cfg_table(config: dict) -> Table:
+    global _cfg_table_cache
+    if _cfg_table_cache is not None and _cfg_table_cache[0] == id(config):
+        return _cfg_table_cache[1]
+    cfg_table = Table(show_header=False, box=box.SIMPLE, padding=(0, 2))
+    cfg_table.add_column("Key", style="dim")
+    cfg_table.add_column("Value")
+    cfg_table.add_row("Min confidence", str(config.get("min_confidence", 0.7)))
+    cfg_table.add_row("Max position size", f"${config.get('max_position_size_usd', 500)}")
+    cfg_table.add_row("Poll interval", f"{config.get('poll_interval_seconds', 60)}s")
+    cfg_table.add_row("Holding period", f"{config.get('holding_period_days', 7)} days")
+    cfg_table.add_row("Min author karma", str(config.get("min_author_karma", 100)))
+    _cfg_table_cache = (id(config), cfg_table)
+    return cfg_table
+
+
+def _new_pos_table() -> Table:
+    pos_table = Table(title="Open Positions", box=box.SIMPLE_HEAVY, show_lines=False)
+    pos_table.add_column("Ticker", style="cyan bold")
+    pos_table.add_column("Dir", style="white")
+    pos_table.add_column("Type", style="dim")
+    pos_table.add_column("Qty", justify="right")
+    pos_table.add_column("Entry", justify="right")
+    pos_table.add_column("Current", justify="right")
+    pos_table.add_column("Unr. P&L", justify="right")
+    pos_table.add_column("Opened", style="dim")
+    return pos_table
+
+
 def print_dashboard(config: dict, summary: dict) -> None:
     open_count = summary["open_count"]
     realised = summary["total_realised_pnl"]
@@ -82,40 +122,23 @@ def print_dashboard(config: dict, summary: dict) -> None:
     )
 
     # ── Config summary ─────────────────────────────────────────────────────────
-    cfg_table = Table(show_header=False, box=box.SIMPLE, padding=(0, 2))
-    cfg_table.add_column("Key", style="dim")
-    cfg_table.add_column("Value")
-    cfg_table.add_row("Min confidence", str(config.get("min_confidence", 0.7)))
-    cfg_table.add_row("Max position size", f"${config.get('max_position_size_usd', 500)}")
-    cfg_table.add_row("Poll interval", f"{config.get('poll_interval_seconds', 60)}s")
-    cfg_table.add_row("Holding period", f"{config.get('holding_period_days', 7)} days")
-    cfg_table.add_row("Min author karma", str(config.get("min_author_karma", 100)))
-    console.print(cfg_table)
+    console.print(_get_cfg_table(config))
 
     # ── Open positions table ───────────────────────────────────────────────────
     if trades:
-        pos_table = Table(title="Open Positions", box=box.SIMPLE_HEAVY, show_lines=False)
-        pos_table.add_column("Ticker", style="cyan bold")
-        pos_table.add_column("Dir", style="white")
-        pos_table.add_column("Type", style="dim")
-        pos_table.add_column("Qty", justify="right")
-        pos_table.add_column("Entry", justify="right")
-        pos_table.add_column("Current", justify="right")
-        pos_table.add_column("Unr. P&L", justify="right")
-        pos_table.add_column("Opened", style="dim")
-
+        pos_table = _new_pos_table()
         for t in trades:
-            pnl = float(t.get("pnl") or 0)
+            pnl = float(t["pnl"] or 0)
             pnl_str = f"[green]${pnl:+.2f}[/green]" if pnl >= 0 else f"[red]${pnl:+.2f}[/red]"
             pos_table.add_row(
                 t["ticker"],
                 t["direction"],
-                t.get("asset_type", "?"),
-                f"{float(t['qty']):.4g}" if t.get("qty") else "?",
-                f"${float(t['entry_price']):.2f}" if t.get("entry_price") else "?",
-                f"${float(t['current_price']):.2f}" if t.get("current_price") else "?",
+                t["asset_type"] or "?",
+                f"{float(t['qty']):.4g}" if t["qty"] else "?",
+                f"${float(t['entry_price']):.2f}" if t["entry_price"] else "?",
+                f"${float(t['current_price']):.2f}" if t["current_price"] else "?",
                 pnl_str,
-                (t.get("opened_at") or "")[:16],
+                (t["opened_at"] or "")[:16],
             )
         console.print(pos_table)
     else:
@@ -128,35 +151,37 @@ def print_dashboard(config: dict, summary: dict) -> None:
 
 def run_pipeline(
     post,
+    filter_result: FilterResult,
     config: dict,
-    post_filter: PostFilter,
     signal_parser: SignalParser,
     trade_executor: TradeExecutor,
     position_manager: PositionManager,
+    rejected_rows: list,
 ) -> None:
     """
     Run a single Reddit post through the full pipeline:
       filter → LLM parse → position check → execute → DB audit trail
+
+    *filter_result* comes from PostFilter.filter_batch(), which the caller
+    runs over the whole poll cycle up front.
+
+    Posts that fail the filter are appended to *rejected_rows* so the caller
+    can write the whole poll cycle's rejects with one db.save_posts_many().
+    A passing post and its signal are committed together once Claude has
+    answered; the trade row is written separately after the order is placed,
+    so no transaction is ever held open across an API call.
     """
     # ── 1. Filter ─────────────────────────────────────────────────────────────
-    filter_result = post_filter.filter(post)
-
-    # Save post record regardless of filter outcome
-    db.save_post(
-        subreddit=post.subreddit,
-        post_id=post.post_id,
-        title=post.title,
-        body=post.body,
-        author=post.author,
-        created_utc=post.created_utc,
-        upvotes=post.upvotes,
-        awards=post.awards,
-        filter_passed=filter_result.passed,
-        filter_reason=filter_result.reason,
+    post_row = (
+        post.subreddit, post.post_id, post.title, post.body, post.author,
+        post.created_utc, post.upvotes, post.awards,
+        filter_result.passed, filter_result.reason,
     )
 
     if not filter_result.passed:
-        logger.debug("FILTERED [%s]: %s", filter_result.reason, post.title[:60])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("FILTERED [%s]: %s", filter_result.reason, post.title[:60])
+        rejected_rows.append(post_row)
         return
 
     logger.info(
@@ -167,7 +192,20 @@ def run_pipeline(
     )
 
     # ── 2. LLM signal parse ────────────────────────────────────────────────────
-    signal = signal_parser.parse(post)
+    try:
+        signal = signal_parser.parse(post)
+    except Exception:
+        # Record the post anyway so a post that breaks the parser is not
+        # re-fetched and re-run every poll
+        db.save_post(*post_row)
+        raise
+
+    # Post + signal in one short commit; the Claude call above stays outside it
+    with db.transaction():
+        db.save_post(*post_row)
+        if signal is not None:
+            signal_parser.save(signal)
+
     if signal is None:
         logger.info("No actionable signal from post %s", post.post_id)
         return
@@ -179,6 +217,8 @@ def run_pipeline(
     )
 
     # ── 3. Position check + execution ─────────────────────────────────────────
+    # Outside any transaction: the order is placed first, then its trade row
+    # is committed on its own
     opened = position_manager.maybe_open_position(signal, trade_executor)
     if opened:
         logger.info("TRADE submitted: %s %s", signal.direction.upper(), signal.ticker)
@@ -192,6 +232,7 @@ def main() -> None:
     # ── Environment + config ──────────────────────────────────────────────────
     load_dotenv()
     config = load_config()
+    set_console_level(config.get("console_log_level", "INFO"))
 
     # ── Database ──────────────────────────────────────────────────────────────
     db.init_db()
@@ -267,31 +308,40 @@ def main() -> None:
                 posts = reddit_monitor.fetch_new_posts()
                 if posts:
                     logger.info("Processing %d new post(s)...", len(posts))
-                for post in posts:
+                rejected_rows: list = []
+                filter_results = post_filter.filter_batch(posts)
+                # Overlap the Claude calls for every passing post up front;
+                # run_pipeline() below then parses from the response cache
+                signal_parser.prefetch(
+                    [post for post, result in zip(posts, filter_results) if result.passed]
+                )
+                for post, filter_result in zip(posts, filter_results):
                     if shutdown_event.is_set():
                         break
                     try:
                         run_pipeline(
-                            post, config, post_filter, signal_parser,
-                            trade_executor, position_manager,
+                            post, filter_result, config, signal_parser,
+                            trade_executor, position_manager, rejected_rows,
                         )
                     except Exception as exc:
                         logger.error(
                             "Pipeline error for post %s: %s", post.post_id, exc, exc_info=True
                         )
-                    # Brief pause between posts to be kind to APIs
-                    time.sleep(0.5)
+                db.save_posts_many(rejected_rows)
 
             except Exception as exc:
                 logger.error("Reddit fetch error: %s", exc, exc_info=True)
 
-        # Sleep briefly to keep CPU idle between polls
-        time.sleep(1)
+        # Park until the next poll or dashboard is due (or shutdown is requested)
+        next_due = min(last_poll + poll_interval, last_dashboard + DASHBOARD_INTERVAL)
+        shutdown_event.wait(timeout=max(0.0, next_due - time.time()))
 
     # ── Cleanup ────────────────────────────────────────────────────────────────
     bg_thread.join(timeout=10)
+    signal_parser.close()
     console.print("\n[bold green]ContraBot stopped cleanly.[/bold green]")
     logger.info("ContraBot stopped")
+    stop_logging()
 
 
 if __name__ == "__main__":
@@ -12,10 +12,10 @@ Responsibilities
      is discarded with a clear log message.
 """
 
+import sqlite3
 import threading
 import time
-from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import db
 from logger import get_logger
@@ -27,6 +27,53 @@ logger = get_logger(__name__)
 # How often (seconds) the background thread checks positions
 _POSITION_CHECK_INTERVAL = 300  # 5 minutes
 
+# How long (seconds) a fetched price is reused within one check cycle
+_PRICE_CACHE_TTL = 30.0
+
+
+def _pnl(trade: sqlite3.Row, current: float) -> float:
+    """P&L of *trade* at price *current*: long gains as price rises, short as it falls."""
+    sign = 1.0 if trade["direction"] == "long" else -1.0
+    return sign * (current - float(trade["entry_price"] or 0)) * float(trade["qty"] or 0)
+
+
+class _PriceCache:
+    """
+    Short-lived memo over TradeExecutor price lookups keyed by
+    (ticker, asset_type), so one check cycle fetches each ticker once.
+    Failed lookups are not cached.
+    """
+
+    def __init__(self, executor: TradeExecutor, ttl: float = _PRICE_CACHE_TTL) -> None:
+        self._executor = executor
+        self._ttl = ttl
+        self._entries: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+    def get(self, ticker: str, asset_type: str) -> Optional[float]:
+        key = (ticker, asset_type)
+        now = time.monotonic()
+        hit = self._entries.get(key)
+        if hit is not None and now - hit[0] < self._ttl:
+            return hit[1]
+        price = self._executor.get_current_price(ticker, asset_type)
+        if price is not None:
+            self._entries[key] = (now, price)
+        return price
+
+    def prefetch(self, keys: Iterable[Tuple[str, str]]) -> None:
+        """Fetch every uncached key with one multi-symbol quote request per asset type."""
+        now = time.monotonic()
+        missing: Dict[str, List[str]] = {}
+        for ticker, asset_type in keys:
+            hit = self._entries.get((ticker, asset_type))
+            if hit is None or now - hit[0] >= self._ttl:
+                missing.setdefault(asset_type, []).append(ticker)
+        # Grouped by asset type, not endpoint: an unquotable option symbol
+        # must not fail the batch for real stocks
+        for asset_type, tickers in missing.items():
+            for ticker, price in self._executor.get_current_prices(tickers, asset_type).items():
+                self._entries[(ticker, asset_type)] = (now, price)
+
 
 class PositionManager:
     def __init__(self, config: dict, executor: TradeExecutor) -> None:
@@ -44,17 +91,18 @@ class PositionManager:
         Returns True if a trade was submitted (or queued).
         """
         with self._lock:
+            checks = db.preflight_open(signal.ticker, hours=24)
+
             # 1. Already have a position in this ticker?
-            existing = db.get_open_trade_for_ticker(signal.ticker)
-            if existing is not None:
+            if checks["existing_id"] is not None:
                 logger.info(
                     "Skipping %s — already have an open position (trade_id=%d)",
-                    signal.ticker, existing["id"],
+                    signal.ticker, checks["existing_id"],
                 )
                 return False
 
             # 2. Check for a recent signal for this ticker (deduplication window)
-            if db.has_recent_signal_for_ticker(signal.ticker, hours=24):
+            if checks["recent_signal"]:
                 logger.info(
                     "Skipping %s — already generated a signal within 24 h",
                     signal.ticker,
@@ -62,8 +110,7 @@ class PositionManager:
                 return False
 
             # 3. Max open positions cap
-            open_count = db.count_open_positions()
-            if open_count >= self._max_positions:
+            if checks["open_count"] >= self._max_positions:
                 logger.warning(
                     "Max open positions (%d) reached — skipping %s",
                     self._max_positions, signal.ticker,
@@ -85,76 +132,55 @@ class PositionManager:
         logger.info("Position manager background thread started")
         while not shutdown_event.is_set():
             try:
-                self._refresh_pnl()
-                self._auto_close_stale()
+                prices = _PriceCache(self._executor)  # fresh per cycle
+                trades = db.get_open_trades()
+                self._refresh_pnl(trades, prices)
+                self._auto_close_stale(trades, prices)
             except Exception as exc:
                 logger.error("Error in periodic position check: %s", exc, exc_info=True)
-            # Sleep in small increments so we respond to shutdown quickly
-            for _ in range(_POSITION_CHECK_INTERVAL):
-                if shutdown_event.is_set():
-                    break
-                time.sleep(1)
+            # Block until the next check is due; returns early on shutdown
+            if shutdown_event.wait(_POSITION_CHECK_INTERVAL):
+                break
         logger.info("Position manager background thread stopped")
 
     # ── Internal ───────────────────────────────────────────────────────────────
 
-    def _refresh_pnl(self) -> None:
-        """Update current_price and unrealised P&L for every open position."""
-        trades = db.get_open_trades()
+    def _refresh_pnl(self, trades: List[sqlite3.Row], prices: _PriceCache) -> None:
+        """Update current_price and unrealised P&L for every trade in *trades*."""
         if not trades:
             return
-        for trade in trades:
-            ticker = trade["ticker"]
-            asset_type = trade["asset_type"] or "stock"
-            entry = float(trade["entry_price"] or 0)
-            qty = float(trade["qty"] or 0)
-            direction = trade["direction"]
+        # Quote every distinct ticker up front in batched requests so the
+        # loop below is served from the cache
+        prices.prefetch({(t["ticker"], t["asset_type"] or "stock") for t in trades})
 
-            current = self._executor.get_current_price(ticker, asset_type)
+        updates = []  # (current_price, pnl, trade_id), flushed in one commit
+        for trade in trades:
+            current = prices.get(trade["ticker"], trade["asset_type"] or "stock")
             if current is None or current <= 0:
                 continue
+            updates.append((current, _pnl(trade, current), trade["id"]))
 
-            if direction == "long":
-                pnl = (current - entry) * qty
-            else:  # short
-                pnl = (entry - current) * qty
-
-            db.update_trade_price(trade["id"], current_price=current, pnl=pnl)
-
+        db.update_trade_prices_bulk(updates)
         logger.debug("Refreshed P&L for %d open position(s)", len(trades))
 
-    def _auto_close_stale(self) -> None:
-        """Close any position that has been open longer than holding_period_days."""
-        cutoff = datetime.utcnow() - timedelta(days=self._holding_days)
-        trades = db.get_open_trades()
+    def _auto_close_stale(self, trades: List[sqlite3.Row], prices: _PriceCache) -> None:
+        """Close any of *trades* that has been open longer than holding_period_days."""
+        cutoff = int(time.time()) - self._holding_days * 86400
 
         for trade in trades:
-            opened_at_str = trade.get("opened_at") or ""
-            if not opened_at_str:
-                continue
-            try:
-                opened_at = datetime.fromisoformat(opened_at_str)
-            except ValueError:
-                continue
-
-            if opened_at < cutoff:
+            opened_at_epoch = trade["opened_at_epoch"]
+            if opened_at_epoch is not None and opened_at_epoch < cutoff:
                 ticker = trade["ticker"]
                 asset_type = trade["asset_type"] or "stock"
                 logger.info(
                     "Auto-closing stale position: %s (opened %s, %d days old)",
-                    ticker, opened_at_str[:10], self._holding_days,
+                    ticker, (trade["opened_at"] or "")[:10], self._holding_days,
                 )
                 closed = self._executor.close_position(ticker, asset_type)
                 if closed:
                     # Fetch final price for P&L calculation
-                    current = self._executor.get_current_price(ticker, asset_type) or 0.0
-                    entry = float(trade["entry_price"] or 0)
-                    qty = float(trade["qty"] or 0)
-                    direction = trade["direction"]
-                    if direction == "long":
-                        final_pnl = (current - entry) * qty
-                    else:
-                        final_pnl = (entry - current) * qty
+                    current = prices.get(ticker, asset_type) or 0.0
+                    final_pnl = _pnl(trade, current)
                     db.close_trade(trade["id"], current_price=current, pnl=final_pnl)
                     logger.info(
                         "Position closed: %s | final P&L = $%.2f", ticker, final_pnl
@@ -164,7 +190,7 @@ class PositionManager:
         """Return a dict suitable for the dashboard."""
         trades = db.get_open_trades()
         total_pnl = db.get_total_pnl()
-        unrealised = sum(float(t.get("pnl") or 0) for t in trades)
+        unrealised = sum(float(t["pnl"] or 0) for t in trades)
         return {
             "open_count": len(trades),
             "total_realised_pnl": total_pnl,
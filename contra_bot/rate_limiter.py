@@ -0,0 +1,39 @@
+"""
+Outbound API throttling.
+
+A single token bucket is shared by every external call made from the
+pipeline (Claude signal parsing, Alpaca order submission), so only posts
+that actually reach an API are slowed down — filtered posts flow through
+at full speed.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket: refills *rate* tokens/second, banks up to *burst*."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+# Shared by signal_parser and trade_executor: 2 calls/s, bursts of up to 4
+api_bucket = TokenBucket(rate=2.0, burst=4)
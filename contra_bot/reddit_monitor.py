@@ -8,7 +8,8 @@ Reddit post ingestion via PRAW.
 """
 
 import os
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from typing import List, Optional
 
@@ -16,13 +17,21 @@ import praw
 from praw.models import Submission
 from prawcore.exceptions import PrawcoreException
 
-from db import is_post_processed
+from db import get_processed_post_ids
 from logger import get_logger
 
 logger = get_logger(__name__)
 
+# Post bodies are cut to this many characters at ingestion; the LLM only
+# ever sees the first 4000 (signal_parser._BODY_CHAR_LIMIT)
+_MAX_BODY_CHARS = 4096
 
-@dataclass
+# Minimum fetch-pool size, bounding concurrent profile lookups when
+# fetch_author_karma is on
+_KARMA_FETCH_WORKERS = 8
+
+
+@dataclass(slots=True)
 class PostData:
     post_id: str
     subreddit: str
@@ -41,7 +50,28 @@ class RedditMonitor:
     def __init__(self, config: dict) -> None:
         self._subreddits: List[str] = config["subreddits"]
         self._posts_per_poll: int = int(config.get("posts_per_poll", 25))
-        self._reddit = self._build_client()
+        # Karma needs one profile request per author, so it is opt-in
+        self._fetch_author_karma: bool = bool(config.get("fetch_author_karma", False))
+
+        client_id = os.getenv("REDDIT_CLIENT_ID")
+        client_secret = os.getenv("REDDIT_CLIENT_SECRET")
+        if not client_id or not client_secret:
+            raise EnvironmentError(
+                "REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET must be set in the environment."
+            )
+        self._credentials = (
+            client_id, client_secret, os.getenv("REDDIT_USER_AGENT", "ContraBot/1.0")
+        )
+
+        # praw.Reddit is not thread-safe, so every fetch thread gets its own
+        # (see _client()).  The pool lives as long as the monitor, so those
+        # clients and the threads' DB connections are reused across polls.
+        # Subreddit polls and karma lookups share it.
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(len(self._subreddits), _KARMA_FETCH_WORKERS),
+            thread_name_prefix="RedditFetch",
+        )
 
     # ── Public API ─────────────────────────────────────────────────────────────
 
@@ -51,30 +81,31 @@ class RedditMonitor:
         Returns only posts that have not been seen before.
         """
         results: List[PostData] = []
-        for subreddit_name in self._subreddits:
+        # Fetches are HTTP-bound, so poll every subreddit at once
+        futures = {self._pool.submit(self._fetch_subreddit, s): s for s in self._subreddits}
+        for future in as_completed(futures):
+            subreddit_name = futures[future]
             try:
-                posts = self._fetch_subreddit(subreddit_name)
-                results.extend(posts)
-                # Small polite delay between subreddits
-                time.sleep(0.5)
+                results.extend(future.result())
             except PrawcoreException as exc:
                 logger.warning("Reddit API error for r/%s: %s", subreddit_name, exc)
             except Exception as exc:
                 logger.error("Unexpected error fetching r/%s: %s", subreddit_name, exc, exc_info=True)
+        if self._fetch_author_karma:
+            self._load_author_karma(results)
         return results
 
     # ── Internal helpers ───────────────────────────────────────────────────────
 
-    def _build_client(self) -> praw.Reddit:
-        client_id = os.getenv("REDDIT_CLIENT_ID")
-        client_secret = os.getenv("REDDIT_CLIENT_SECRET")
-        user_agent = os.getenv("REDDIT_USER_AGENT", "ContraBot/1.0")
-
-        if not client_id or not client_secret:
-            raise EnvironmentError(
-                "REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET must be set in the environment."
-            )
+    def _client(self) -> praw.Reddit:
+        """This thread's Reddit client, built on first use."""
+        reddit = getattr(self._local, "reddit", None)
+        if reddit is None:
+            reddit = self._local.reddit = self._build_client()
+        return reddit
 
+    def _build_client(self) -> praw.Reddit:
+        client_id, client_secret, user_agent = self._credentials
         reddit = praw.Reddit(
             client_id=client_id,
             client_secret=client_secret,
@@ -82,15 +113,19 @@ class RedditMonitor:
             # Read-only mode — we never post to Reddit
             read_only=True,
         )
-        logger.info("Reddit client initialised (read-only)")
+        logger.info("Reddit client initialised (read-only, %s)", threading.current_thread().name)
         return reddit
 
     def _fetch_subreddit(self, subreddit_name: str) -> List[PostData]:
-        subreddit = self._reddit.subreddit(subreddit_name)
+        subreddit = self._client().subreddit(subreddit_name)
         posts: List[PostData] = []
 
-        for submission in subreddit.new(limit=self._posts_per_poll):
-            if is_post_processed(submission.id):
+        submissions = list(subreddit.new(limit=self._posts_per_poll))
+        # One bulk lookup instead of a DB round-trip per submission
+        seen = get_processed_post_ids([s.id for s in submissions])
+
+        for submission in submissions:
+            if submission.id in seen:
                 continue  # Already in our DB
 
             post = self._extract(submission, subreddit_name)
@@ -106,22 +141,34 @@ class RedditMonitor:
         logger.info("r/%s → %d new posts", subreddit_name, len(posts))
         return posts
 
+    def _load_author_karma(self, posts: List[PostData]) -> None:
+        """Fill in author_karma, loading each distinct author's profile once, concurrently."""
+        authors = list({post.author for post in posts if post.author != "[deleted]"})
+        if not authors:
+            return
+        karma = dict(zip(authors, self._pool.map(self._author_karma, authors)))
+        for post in posts:
+            post.author_karma = karma.get(post.author)
+
+    def _author_karma(self, name: str) -> Optional[int]:
+        try:
+            redditor = self._client().redditor(name)
+            return redditor.link_karma + redditor.comment_karma
+        except Exception:
+            return None  # Karma fetch is best-effort
+
     @staticmethod
     def _extract(submission: Submission, subreddit_name: str) -> Optional[PostData]:
         """Convert a PRAW Submission into a PostData, handling missing fields gracefully."""
         try:
+            # str() on the lazy Redditor gives the name without a profile request;
+            # karma is filled in afterwards by _load_author_karma() if enabled
             author_name = str(submission.author) if submission.author else "[deleted]"
-            author_karma: Optional[int] = None
-            try:
-                if submission.author:
-                    author_karma = submission.author.link_karma + submission.author.comment_karma
-            except Exception:
-                pass  # Karma fetch is best-effort
 
             # Count gildings as a proxy for "awards"
             awards = sum(submission.gildings.values()) if submission.gildings else 0
 
-            body = (submission.selftext or "").strip()
+            body = (submission.selftext or "")[:_MAX_BODY_CHARS].strip()
             # Treat removed/deleted bodies as empty
             if body in ("[removed]", "[deleted]"):
                 body = ""
@@ -133,7 +180,7 @@ class RedditMonitor:
                 body=body,
                 url=submission.url or "",
                 author=author_name,
-                author_karma=author_karma,
+                author_karma=None,
                 created_utc=float(submission.created_utc),
                 upvotes=int(submission.score or 0),
                 awards=awards,
@@ -10,28 +10,39 @@ Applies sentiment inversion if config mode == "against":
   call  → put     |   put   → call
 """
 
+import asyncio
+import hashlib
 import json
 import time
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import anthropic
 
 import db
 from logger import get_logger
+from rate_limiter import api_bucket
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = get_logger(__name__)
 
+# orjson when installed (raises a json.JSONDecodeError subclass), else stdlib
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 # ─── Data models ──────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class OptionDetails:
     expiry: str            # YYYY-MM-DD
     strike: float          # Strike price in USD
     contract_type: str     # "call" or "put"  (post-inversion)
 
 
-@dataclass
+@dataclass(slots=True)
 class TradeSignal:
     ticker: str
     asset_type: str          # "stock" | "crypto" | "option"
@@ -82,13 +93,25 @@ Rules:
 7. Never invent a ticker that is not in the post.
 """
 
-_USER_TEMPLATE = """\
-Subreddit: r/{subreddit}
-Title: {title}
 
-Body:
-{body}
-"""
+def _user_prompt(subreddit: str, title: str, body: str) -> str:
+    # An f-string is compiled once with the module; str.format() re-parses
+    # the template on every call
+    return f"Subreddit: r/{subreddit}\nTitle: {title}\n\nBody:\n{body}\n"
+
+
+# Body characters sent to Claude; caps tokens per request
+_BODY_CHAR_LIMIT = 4000
+
+# Part of the response-cache key, so a model change never serves stale output
+_MODEL = "claude-sonnet-4-6"
+
+# Sentiment inversion maps used by _invert()
+_DIRECTION_FLIP = {"long": "short", "short": "long"}
+_CONTRACT_FLIP = {"call": "put", "put": "call"}
+
+# In-flight Claude requests during prefetch(); api_bucket still sets the pace
+_MAX_CONCURRENT_CALLS = 8
 
 # ─── Retry helper ──────────────────────────────────────────────────────────────
 
@@ -118,7 +141,14 @@ class SignalParser:
         self._mode: str = config.get("mode", "against").lower()
         self._min_confidence: float = float(config.get("min_confidence", 0.7))
         self._markets_enabled: list = [m.lower() for m in config.get("markets_enabled", ["stocks"])]
+        # Normalise: config uses "stocks" (plural) but the LLM returns "stock"
+        self._enabled: frozenset = frozenset(m.rstrip("s") for m in self._markets_enabled)
         self._client = anthropic.Anthropic()  # reads ANTHROPIC_API_KEY from env
+        # prefetch() always runs on this loop: the async client binds its
+        # connection pool to the loop that first uses it, so one loop lets
+        # one client (and its connections) serve every poll
+        self._loop = asyncio.new_event_loop()
+        self._async_client = anthropic.AsyncAnthropic()
         logger.info(
             "SignalParser ready | mode=%s | min_confidence=%.2f | markets=%s",
             self._mode, self._min_confidence, self._markets_enabled,
@@ -130,12 +160,24 @@ class SignalParser:
         """
         Send *post* to Claude, parse the JSON response, apply inversion if needed,
         and return a TradeSignal.  Returns None if the post should not generate a trade.
+        Nothing is written to the DB; persist the signal with save().
         """
-        raw_json = self._call_claude(post)
-        if raw_json is None:
+        user_content, cache_key = self._build_prompt(post)
+        response = self._call_claude(post.post_id, user_content, cache_key)
+        if response is None:
             return None
+        raw_json, from_cache = response
 
-        signal = self._parse_response(raw_json, post.post_id)
+        try:
+            signal = self._parse_response(raw_json, post.post_id)
+        except ValueError as exc:
+            logger.warning("Unusable Claude response: %s | raw=%s", exc, raw_json[:200])
+            if from_cache:
+                self._uncache(cache_key)
+            return None
+        # Only replies that parse are cached, so a malformed one gets retried
+        if not from_cache:
+            self._cache(cache_key, raw_json)
         if signal is None:
             return None
 
@@ -149,9 +191,7 @@ class SignalParser:
 
         # ── Market gate ───────────────────────────────────────────────────────
         asset_key = signal.asset_type  # "stock", "crypto", "option"
-        # Normalise: config uses "stocks" (plural) but LLM returns "stock"
-        enabled = {m.rstrip("s") for m in self._markets_enabled}
-        if asset_key not in enabled:
+        if asset_key not in self._enabled:
             logger.info(
                 "Signal discarded (asset_type '%s' not in markets_enabled=%s): %s",
                 asset_key, self._markets_enabled, signal.ticker,
@@ -160,9 +200,11 @@ class SignalParser:
 
         # ── Sentiment inversion ───────────────────────────────────────────────
         if self._mode == "against":
-            signal = self._invert(signal)
+            self._invert(signal)
+        return signal
 
-        # ── Persist to DB ─────────────────────────────────────────────────────
+    def save(self, signal: TradeSignal) -> int:
+        """Persist *signal* to the DB, set its signal_id and return it."""
         signal_id = db.save_signal(
             post_id=signal.post_id,
             ticker=signal.ticker,
@@ -177,35 +219,145 @@ class SignalParser:
             "Signal saved [id=%d]: %s %s (%s) conf=%.2f",
             signal_id, signal.ticker, signal.direction, signal.asset_type, signal.confidence,
         )
-        return signal
+        return signal_id
+
+    def prefetch(self, posts: List) -> None:
+        """
+        Warm the response cache for *posts* with up to _MAX_CONCURRENT_CALLS
+        Claude requests in flight, so the parse() calls that follow are served
+        from the cache instead of waiting on the API one post at a time.
+        Best-effort: anything that fails here is retried by parse().
+        """
+        pending: List[Tuple[str, str]] = []  # (cache_key, user_content)
+        for post in posts:
+            user_content, cache_key = self._build_prompt(post)
+            if db.get_llm_cache(cache_key) is None:
+                pending.append((cache_key, user_content))
+        if not pending:
+            return
+
+        try:
+            responses = self._loop.run_until_complete(
+                self._fetch_all([content for _, content in pending])
+            )
+        except Exception as exc:
+            logger.warning("Claude prefetch failed: %s", exc)
+            return
+        fetched = [
+            (cache_key, text)
+            for (cache_key, _), text in zip(pending, responses)
+            if text is not None and self._is_parseable(text)
+        ]
+        db.put_llm_cache_many(fetched)
+        logger.debug("Prefetched %d/%d Claude response(s)", len(fetched), len(pending))
+
+    def close(self) -> None:
+        """Close the async client's connection pool, then its event loop."""
+        try:
+            self._loop.run_until_complete(self._async_client.close())
+        except Exception as exc:
+            logger.warning("Error closing async Claude client: %s", exc)
+        finally:
+            self._loop.close()
 
     # ── Internal helpers ───────────────────────────────────────────────────────
 
-    def _call_claude(self, post) -> Optional[str]:
-        user_content = _USER_TEMPLATE.format(
-            subreddit=post.subreddit,
-            title=post.title,
-            body=(post.body or "")[:4000],  # cap to keep tokens reasonable
+    @staticmethod
+    def _build_prompt(post) -> Tuple[str, str]:
+        """Return (user_content, cache_key) for *post*."""
+        user_content = _user_prompt(
+            post.subreddit, post.title, (post.body or "")[:_BODY_CHAR_LIMIT]
         )
+        # Identical prompts (re-processing after a crash, reposts) are served
+        # from the persistent cache instead of paying for another API call
+        cache_key = hashlib.sha256(
+            f"{_MODEL}\0{_SYSTEM_PROMPT}\0{user_content}".encode()
+        ).hexdigest()
+        return user_content, cache_key
+
+    async def _fetch_all(self, contents: List[str]) -> List[Optional[str]]:
+        """Send every prompt in *contents* concurrently; None marks a failed call."""
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_CALLS)
+
+        async def fetch(user_content: str) -> Optional[str]:
+            async with semaphore:
+                await asyncio.to_thread(api_bucket.acquire)
+                try:
+                    response = await self._async_client.messages.create(
+                        model=_MODEL,
+                        max_tokens=512,
+                        system=_SYSTEM_PROMPT,
+                        messages=[{"role": "user", "content": user_content}],
+                    )
+                    return response.content[0].text
+                except anthropic.APIError as exc:
+                    logger.debug("Claude prefetch call failed: %s", exc)
+                    return None
+
+        return await asyncio.gather(*(fetch(content) for content in contents))
+
+    def _call_claude(
+        self, post_id: str, user_content: str, cache_key: str
+    ) -> Optional[Tuple[str, bool]]:
+        """Return (response text, served from cache), or None if the call failed."""
+        cached = db.get_llm_cache(cache_key)
+        if cached is not None:
+            logger.debug("Claude response cache hit for post %s", post_id)
+            return cached, True
+
         try:
+            api_bucket.acquire()
             response = _with_retry(lambda: self._client.messages.create(
-                model="claude-sonnet-4-6",
+                model=_MODEL,
                 max_tokens=512,
                 system=_SYSTEM_PROMPT,
                 messages=[{"role": "user", "content": user_content}],
             ))
-            return response.content[0].text
+            text = response.content[0].text
         except Exception as exc:
             logger.error("Claude API call failed: %s", exc, exc_info=True)
             return None
+        return text, False
+
+    # The response cache is best-effort: a failed write or delete only costs
+    # a repeat API call later
+    @staticmethod
+    def _cache(cache_key: str, text: str) -> None:
+        try:
+            db.put_llm_cache(cache_key, text)
+        except Exception as exc:
+            logger.warning("Could not cache Claude response: %s", exc)
+
+    @staticmethod
+    def _uncache(cache_key: str) -> None:
+        try:
+            db.delete_llm_cache(cache_key)
+        except Exception as exc:
+            logger.warning("Could not evict cached Claude response: %s", exc)
+
+    @classmethod
+    def _is_parseable(cls, raw_json: str) -> bool:
+        try:
+            cls._parse_response(raw_json, "")
+        except ValueError:
+            return False
+        return True
 
     @staticmethod
     def _parse_response(raw_json: str, post_id: str) -> Optional[TradeSignal]:
+        """
+        Build a TradeSignal from Claude's JSON reply; None when it names no
+        ticker.  Raises ValueError if the reply is malformed.
+        """
         try:
-            data = json.loads(raw_json.strip())
-        except json.JSONDecodeError as exc:
-            logger.warning("JSON parse error from Claude: %s | raw=%s", exc, raw_json[:200])
-            return None
+            return SignalParser._signal_from_json(raw_json, post_id)
+        except (TypeError, ValueError, AttributeError) as exc:
+            # json.JSONDecodeError (and orjson's) is a ValueError
+            raise ValueError(f"malformed Claude response: {exc}") from exc
+
+    @staticmethod
+    def _signal_from_json(raw_json: str, post_id: str) -> Optional[TradeSignal]:
+        data = _json_loads(raw_json.strip())
 
         ticker = str(data.get("ticker", "UNKNOWN")).upper().strip()
         if ticker in ("UNKNOWN", "N/A", "", "NULL"):
@@ -250,32 +402,9 @@ class SignalParser:
 
     @staticmethod
     def _invert(signal: TradeSignal) -> TradeSignal:
-        """Flip direction (long↔short) and option contract type (call↔put)."""
-        direction_map = {"long": "short", "short": "long"}
-        contract_map = {"call": "put", "put": "call"}
-
-        new_direction = direction_map.get(signal.direction, signal.direction)
-        new_option_details = None
-
+        """Flip direction (long↔short) and option contract type (call↔put) in place."""
+        signal.direction = _DIRECTION_FLIP.get(signal.direction, signal.direction)
         if signal.option_details is not None:
-            new_contract = contract_map.get(
-                signal.option_details.contract_type,
-                signal.option_details.contract_type,
-            )
-            new_option_details = OptionDetails(
-                expiry=signal.option_details.expiry,
-                strike=signal.option_details.strike,
-                contract_type=new_contract,
-            )
-
-        return TradeSignal(
-            ticker=signal.ticker,
-            asset_type=signal.asset_type,
-            direction=new_direction,
-            raw_direction=signal.raw_direction,
-            confidence=signal.confidence,
-            reasoning=signal.reasoning,
-            option_details=new_option_details,
-            post_id=signal.post_id,
-            signal_id=signal.signal_id,
-        )
+            contract_type = signal.option_details.contract_type
+            signal.option_details.contract_type = _CONTRACT_FLIP.get(contract_type, contract_type)
+        return signal
@@ -12,29 +12,70 @@ Crypto symbol normalisation
   Alpaca expects "BTC/USD", "ETH/USD", etc.
   A mapping covers the most common coins; unknown ones get "/USD" appended.
 
+Entry prices
+  Recorded from a quote at submission time, then corrected to the actual
+  fill price when Alpaca's trade-updates websocket reports the fill.
+
 Short-selling stocks on Alpaca paper trading is enabled by default.
 Shorting crypto is NOT supported on Alpaca; short crypto signals are logged and skipped.
 """
 
+import asyncio
+import json
+import logging
 import os
+import random
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
 
+from alpaca.common.exceptions import APIError
 from alpaca.data.historical import CryptoHistoricalDataClient, StockHistoricalDataClient
 from alpaca.data.requests import CryptoLatestQuoteRequest, StockLatestQuoteRequest
 from alpaca.trading.client import TradingClient
-from alpaca.trading.enums import AssetClass, OrderSide, TimeInForce
-from alpaca.trading.requests import (
-    MarketOrderRequest,
-    GetAssetsRequest,
-)
+from alpaca.trading.enums import AssetClass, AssetStatus, OrderSide, TimeInForce
+from alpaca.trading.requests import GetAssetsRequest, MarketOrderRequest
+from alpaca.trading.stream import TradingStream
 
 import db
 from logger import get_logger
+from rate_limiter import api_bucket
 from signal_parser import TradeSignal
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Option order requests only exist in newer alpaca-py releases
+try:
+    from alpaca.trading.requests import OptionLegRequest, PlaceOptionOrderRequest  # type: ignore[attr-defined]
+    _OPTIONS_AVAILABLE = True
+except ImportError:
+    _OPTIONS_AVAILABLE = False
+
 logger = get_logger(__name__)
 
+# How long (seconds) a market-clock reading is trusted; the clock only
+# flips twice a day, and every stock signal asks for it
+_CLOCK_CACHE_TTL = 30.0
+
+# Upper bound on concurrent order submissions when flushing pending orders
+_ORDER_SUBMIT_WORKERS = 8
+
+# Streamed fills with no trade row yet are parked until the row is committed.
+# Fills for orders that never get a row (e.g. close_position) expire after
+# _EARLY_FILL_TTL seconds; at most _EARLY_FILL_CAP are kept.
+_EARLY_FILL_TTL = 600.0
+_EARLY_FILL_CAP = 1024
+
 # ─── Crypto symbol mapping ─────────────────────────────────────────────────────
 
 _CRYPTO_MAP: dict[str, str] = {
@@ -60,26 +101,142 @@ _CRYPTO_MAP: dict[str, str] = {
     "PEPE": "PEPE/USD",
 }
 
+# Names that don't map to "<name>/USD" (BITCOIN → BTC/USD, ...); every other
+# symbol, mapped or not, is just the ticker plus "/USD"
+_CRYPTO_ALIASES: frozenset[str] = frozenset(
+    name for name, pair in _CRYPTO_MAP.items() if pair != f"{name}/USD"
+)
+
 
+# Both normalisers run several times per trade (execute, quotes, close) on a
+# small set of hot tickers, so memoise them
+@lru_cache(maxsize=512)
 def _to_alpaca_crypto_symbol(ticker: str) -> str:
     upper = ticker.upper()
-    return _CRYPTO_MAP.get(upper, f"{upper}/USD")
+    if upper in _CRYPTO_ALIASES:
+        return _CRYPTO_MAP[upper]
+    # Already a pair (e.g. a stored trade's "BTC/USD"): leave it alone
+    return upper if upper.endswith("/USD") else f"{upper}/USD"
 
 
+@lru_cache(maxsize=512)
 def _to_alpaca_stock_symbol(ticker: str) -> str:
     return ticker.upper().replace("/", "")
 
 
+# ─── Tradable-asset cache ──────────────────────────────────────────────────────
+# Alpaca's asset list is a 1–2 MB download that rarely changes, so the
+# tradable symbols are kept on disk and refreshed at most once a day.
+
+_ASSET_CACHE_PATH = Path("assets_cache.json")
+_ASSET_CACHE_TTL = 24 * 3600  # seconds
+
+# After a failed download, try again this soon (seconds) instead of a day later
+_ASSET_RETRY_DELAY = 15 * 60
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+# ─── Quote requests ────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=256)
+def _latest_quote_request(crypto: bool, symbols: Tuple[str, ...]):
+    """
+    Latest-quote request for a sorted tuple of *symbols*, validated once per
+    distinct symbol set: each refresh cycle and hot single-ticker lookup
+    reuses the same request object.
+    """
+    if crypto:
+        return CryptoLatestQuoteRequest(symbol_or_symbols=list(symbols))
+    return StockLatestQuoteRequest(symbol_or_symbols=list(symbols))
+
+
+# ─── Order requests ────────────────────────────────────────────────────────────
+
+_ORDER_SIDE = {"long": OrderSide.BUY, "short": OrderSide.SELL}
+
+# Log label per side, so order logs don't rebuild it with .value.upper()
+_SIDE_LABEL = {OrderSide.BUY: "BUY", OrderSide.SELL: "SELL"}
+
+# Only symbol, qty (and side, for stocks) vary per order.  Crypto is
+# long-only on Alpaca and trades 24/7, hence BUY + GTC.
+_stock_market_order = partial(MarketOrderRequest, time_in_force=TimeInForce.DAY)
+_crypto_market_order = partial(
+    MarketOrderRequest, side=OrderSide.BUY, time_in_force=TimeInForce.GTC
+)
+
+
+# ─── Option symbols ────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=256)
+def _build_occ(ticker: str, expiry: str, contract_type: str, strike: float) -> str:
+    """
+    OCC option symbol, e.g. ("AAPL", "2024-03-15", "C", 200.0) → "AAPL240315C00200000".
+    *expiry* must be ISO YYYY-MM-DD; raises ValueError otherwise.
+    """
+    if len(expiry) != 10 or expiry[4] != "-" or expiry[7] != "-":
+        raise ValueError(f"expiry {expiry!r} is not YYYY-MM-DD")
+    strike_int = int(strike * 1000 + 0.5)  # strike in thousandths, rounded
+    return f"{ticker}{expiry[2:4]}{expiry[5:7]}{expiry[8:10]}{contract_type}{strike_int:08d}"
+
+
+# ─── HTTP session ──────────────────────────────────────────────────────────────
+
+def _share_session(*clients) -> requests.Session:
+    """
+    Point every alpaca-py REST client at one pooled requests.Session, so
+    keep-alive connections (and their TLS handshakes) are reused across
+    clients and threads instead of each client managing its own pool.
+    """
+    session = requests.Session()
+    # Sized for concurrent order/quote calls; retries are handled by _retry()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+    session.mount("https://", adapter)
+    for client in clients:
+        # _session is a RESTClient internal, so check it before swapping: a
+        # client without one keeps its own pool and still works
+        old = getattr(client, "_session", None)
+        if isinstance(old, requests.Session):
+            client._session = session
+            old.close()
+        else:
+            logger.warning(
+                "%s has no requests.Session to replace (alpaca-py changed?) — "
+                "it keeps its own connection pool",
+                type(client).__name__,
+            )
+    return session
+
+
 # ─── Retry helper ──────────────────────────────────────────────────────────────
 
+# HTTP statuses that mean the request itself was rejected (bad symbol,
+# insufficient buying power, auth) — retrying cannot change the answer
+_NO_RETRY_STATUS = frozenset({400, 401, 403, 404, 422})
+
+
+def _is_transient(exc: Exception) -> bool:
+    """True for network failures and non-client-error API responses."""
+    if isinstance(exc, APIError):
+        return exc.status_code not in _NO_RETRY_STATUS
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
 def _retry(fn, label: str, max_attempts: int = 3, base_delay: float = 1.5):
     for attempt in range(1, max_attempts + 1):
         try:
+            api_bucket.acquire()  # every order attempt is an Alpaca API call
             return fn()
         except Exception as exc:
-            if attempt == max_attempts:
+            if attempt == max_attempts or not _is_transient(exc):
                 raise
-            delay = base_delay * (2 ** (attempt - 1))
+            # ±30 % jitter so concurrent submitters don't retry in lockstep
+            delay = base_delay * (2 ** (attempt - 1)) * random.uniform(0.7, 1.3)
             logger.warning("%s failed (attempt %d): %s — retrying in %.1fs", label, attempt, exc, delay)
             time.sleep(delay)
 
@@ -100,42 +257,99 @@ class TradeExecutor:
         # Trading client (paper=True forces the paper-trading base URL)
         self._trading = TradingClient(api_key, secret_key, paper=True)
 
-        # Data clients for price lookups (no auth required for crypto data)
-        self._stock_data = StockHistoricalDataClient(api_key, secret_key)
-        self._crypto_data = CryptoHistoricalDataClient()
+        # Data clients for price lookups (no auth required for crypto data).
+        # raw_data: quotes come back as plain dicts, skipping pydantic model
+        # validation — we only read two fields (see get_current_prices)
+        self._stock_data = StockHistoricalDataClient(api_key, secret_key, raw_data=True)
+        self._crypto_data = CryptoHistoricalDataClient(raw_data=True)
+        self._session = _share_session(self._trading, self._stock_data, self._crypto_data)
+
+        self._clock_cache: Optional[Tuple[float, bool]] = None  # (monotonic time, is_open)
+        # Warm-up: fetch the clock in the background so the TLS handshake is
+        # done (and the clock cached) before the main loop's first call
+        threading.Thread(target=self.is_market_open, daemon=True, name="AlpacaWarmup").start()
+
+        # Tradable symbols per asset class ("us_equity", "crypto"), or None if
+        # never loaded; see is_tradable().  Refreshed in the background once
+        # _tradable_due (monotonic) passes; the lock marks a refresh in flight.
+        self._tradable: Optional[Dict[str, Set[str]]] = None
+        self._tradable_due = 0.0
+        self._tradable_lock = threading.Lock()
+        self._update_tradable_assets()
+
+        # Fill prices pushed over the trade-updates stream before the order's
+        # trade row was committed: order_id -> (monotonic time, price).
+        # Consumed by _entry_price() and _apply_early_fills()
+        self._early_fills: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._fills_lock = threading.Lock()
+        self._start_trade_stream(api_key, secret_key)
 
         logger.info("TradeExecutor initialised (Alpaca paper trading)")
 
     # ── Public API ─────────────────────────────────────────────────────────────
 
     def is_market_open(self) -> bool:
+        now = time.monotonic()
+        cached = self._clock_cache
+        if cached is not None and now - cached[0] < _CLOCK_CACHE_TTL:
+            return cached[1]
         try:
             clock = self._trading.get_clock()
-            return bool(clock.is_open)
+            is_open = bool(clock.is_open)
+            self._clock_cache = (now, is_open)
+            return is_open
         except Exception as exc:
             logger.warning("Could not fetch market clock: %s", exc)
             return False
 
+    def is_tradable(self, symbol: str, asset_class: AssetClass) -> bool:
+        """
+        True if *symbol* is an active, tradable Alpaca asset of *asset_class*.
+        If the asset list could not be loaded, everything counts as tradable
+        so a failed download never blocks trading.  A due refresh runs in the
+        background; until it finishes the previous list keeps being served.
+        """
+        if time.monotonic() >= self._tradable_due and self._tradable_lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._refresh_tradable_assets, daemon=True, name="AssetRefresh"
+            ).start()
+        tradable = self._tradable
+        symbols = tradable.get(asset_class.value) if tradable is not None else None
+        return symbols is None or symbol in symbols
+
     def get_current_price(self, ticker: str, asset_type: str) -> Optional[float]:
         """Return the latest ask price for a ticker, or None on failure."""
+        return self.get_current_prices([ticker], asset_type).get(ticker)
+
+    def get_current_prices(self, tickers: List[str], asset_type: str) -> Dict[str, float]:
+        """
+        Latest ask (else bid) price for every ticker in *tickers*, fetched with
+        one multi-symbol quote request.  Keyed by the tickers as given; any
+        ticker without a usable quote is left out.
+        """
+        if not tickers:
+            return {}
         try:
             if asset_type == "crypto":
-                symbol = _to_alpaca_crypto_symbol(ticker)
-                req = CryptoLatestQuoteRequest(symbol_or_symbols=symbol)
+                symbols = {ticker: _to_alpaca_crypto_symbol(ticker) for ticker in tickers}
+                req = _latest_quote_request(True, tuple(sorted(set(symbols.values()))))
                 quotes = self._crypto_data.get_crypto_latest_quote(req)
-                quote = quotes.get(symbol)
-                if quote:
-                    return float(quote.ask_price or quote.bid_price)
             else:
-                symbol = _to_alpaca_stock_symbol(ticker)
-                req = StockLatestQuoteRequest(symbol_or_symbols=symbol)
+                symbols = {ticker: _to_alpaca_stock_symbol(ticker) for ticker in tickers}
+                req = _latest_quote_request(False, tuple(sorted(set(symbols.values()))))
                 quotes = self._stock_data.get_stock_latest_quote(req)
-                quote = quotes.get(symbol)
-                if quote:
-                    return float(quote.ask_price or quote.bid_price)
         except Exception as exc:
-            logger.warning("Could not fetch price for %s: %s", ticker, exc)
-        return None
+            logger.warning("Could not fetch price for %s: %s", ", ".join(tickers), exc)
+            return {}
+
+        prices: Dict[str, float] = {}
+        for ticker, symbol in symbols.items():
+            quote = quotes.get(symbol)
+            # Raw quote fields: "ap" = ask price, "bp" = bid price
+            price = (quote.get("ap") or quote.get("bp")) if quote else None
+            if price:
+                prices[ticker] = float(price)
+        return prices
 
     def execute(self, signal: TradeSignal) -> bool:
         """
@@ -147,12 +361,8 @@ class TradeExecutor:
 
         Returns True if an order was submitted (or queued), False otherwise.
         """
-        if signal.asset_type == "option":
-            return self._execute_option(signal)
-        if signal.asset_type == "crypto":
-            return self._execute_crypto(signal)
-        # Default: stock
-        return self._execute_stock(signal)
+        handler, normalise = self._DISPATCH.get(signal.asset_type, self._DISPATCH["stock"])
+        return handler(self, signal, normalise(signal.ticker))
 
     def submit_pending_orders(self) -> None:
         """Called from the main loop; submits queued stock orders if market is now open."""
@@ -162,18 +372,43 @@ class TradeExecutor:
         if not pending:
             return
         logger.info("Market is open — submitting %d pending order(s)", len(pending))
-        for row in pending:
-            try:
-                self._submit_stock_order(
+        # One quote request for the whole queue instead of one per order
+        prices = self.get_current_prices(list({row["ticker"] for row in pending}), "stock")
+        # Orders are independent, so overlap their round-trips; results are
+        # handled in queue order (api_bucket still paces the actual calls)
+        with ThreadPoolExecutor(
+            max_workers=min(_ORDER_SUBMIT_WORKERS, len(pending)),
+            thread_name_prefix="OrderSubmit",
+        ) as pool:
+            futures = [
+                pool.submit(
+                    self._place_stock_order,
                     signal_id=row["signal_id"],
                     ticker=row["ticker"],
                     direction=row["direction"],
                     qty=row["qty"],
                     asset_type=row["asset_type"],
+                    known_price=prices.get(row["ticker"]),
                 )
-                db.delete_pending_order(row["id"])
-            except Exception as exc:
-                logger.error("Failed to submit pending order %d: %s", row["id"], exc)
+                for row in pending
+            ]
+            trade_rows = []
+            done_ids = []
+            for row, future in zip(pending, futures):
+                try:
+                    trade_row = future.result()
+                except Exception as exc:
+                    logger.error("Failed to submit pending order %d: %s", row["id"], exc)
+                    continue
+                if trade_row is not None:
+                    trade_rows.append(trade_row)
+                done_ids.append(row["id"])
+
+        # Record every placed order and clear the queue in one commit
+        with db.transaction():
+            db.save_trades_bulk(trade_rows)
+            db.delete_pending_orders(done_ids)
+        self._apply_early_fills([trade_row[1] for trade_row in trade_rows])
 
     def close_position(self, ticker: str, asset_type: str) -> bool:
         """Close an open Alpaca position by ticker."""
@@ -190,13 +425,134 @@ class TradeExecutor:
             logger.error("Failed to close position %s: %s", ticker, exc)
             return False
 
+    # ── Tradable assets ────────────────────────────────────────────────────────
+
+    def _refresh_tradable_assets(self) -> None:
+        """Background reload for is_tradable()."""
+        try:
+            self._update_tradable_assets()
+        finally:
+            self._tradable_lock.release()
+
+    def _update_tradable_assets(self) -> None:
+        """
+        Load the asset list and schedule the next refresh for when it turns a
+        day old.  A failed load keeps the old list and retries sooner.
+        """
+        tradable, age = self._load_tradable_assets()
+        if tradable is not None:
+            self._tradable = tradable
+            self._tradable_due = time.monotonic() + _ASSET_CACHE_TTL - age
+        else:
+            self._tradable_due = time.monotonic() + _ASSET_RETRY_DELAY
+
+    def _load_tradable_assets(self) -> Tuple[Optional[Dict[str, Set[str]]], float]:
+        """
+        Tradable symbols per asset class and their age in seconds: from the
+        disk cache if under a day old, else downloaded (age 0).  The symbols
+        are None if the download fails.
+        """
+        try:
+            age = max(0.0, time.time() - _ASSET_CACHE_PATH.stat().st_mtime)
+            if age < _ASSET_CACHE_TTL:
+                cached = _json_loads(_ASSET_CACHE_PATH.read_bytes())
+                tradable = {asset_class: set(symbols) for asset_class, symbols in cached.items()}
+                return tradable, age
+        except (OSError, ValueError):
+            pass  # Missing or unreadable cache: download a fresh list
+
+        try:
+            assets = self._trading.get_all_assets(GetAssetsRequest(status=AssetStatus.ACTIVE))
+        except Exception as exc:
+            logger.warning("Could not fetch Alpaca asset list: %s", exc)
+            return None, 0.0
+        tradable: Dict[str, Set[str]] = {}
+        for asset in assets:
+            if asset.tradable:
+                tradable.setdefault(asset.asset_class.value, set()).add(asset.symbol)
+
+        # Write-then-rename so a crash never leaves a truncated cache behind
+        try:
+            tmp_path = _ASSET_CACHE_PATH.with_suffix(".tmp")
+            tmp_path.write_bytes(_json_dumps({k: sorted(v) for k, v in tradable.items()}))
+            os.replace(tmp_path, _ASSET_CACHE_PATH)
+        except OSError as exc:
+            logger.warning("Could not write asset cache: %s", exc)
+        logger.info(
+            "Loaded %d tradable Alpaca assets", sum(len(v) for v in tradable.values())
+        )
+        return tradable, 0.0
+
+    # ── Trade updates stream ───────────────────────────────────────────────────
+
+    def _start_trade_stream(self, api_key: str, secret_key: str) -> None:
+        """
+        Subscribe to Alpaca's trade-updates websocket so fills are pushed to
+        us: the fill price replaces the quote-based entry_price estimate
+        without any per-order REST follow-up.
+        """
+        try:
+            stream = TradingStream(api_key, secret_key, paper=True)
+            stream.subscribe_trade_updates(self._on_trade_update)
+            threading.Thread(target=stream.run, daemon=True, name="TradeStream").start()
+        except Exception as exc:
+            logger.warning("Trade updates stream unavailable: %s", exc)
+
+    async def _on_trade_update(self, data) -> None:
+        order = data.order
+        if data.event != "fill" or not order.filled_avg_price:
+            return
+        order_id = str(order.id)
+        fill_price = float(order.filled_avg_price)
+        # DB writes block on the writer thread; keep them off the stream's loop
+        await asyncio.to_thread(self._record_fill, order_id, fill_price)
+        logger.debug("Order %s filled @ $%.4f", order_id, fill_price)
+
+    def _record_fill(self, order_id: str, fill_price: float) -> None:
+        """Set the trade's entry price, or park the fill until its row is committed."""
+        # Under the lock so a fill can't slip between a row's commit and the
+        # _apply_early_fills() that follows it
+        with self._fills_lock:
+            if db.set_trade_entry_price(order_id, fill_price):
+                return
+            now = time.monotonic()
+            self._early_fills[order_id] = (now, fill_price)
+            while self._early_fills:
+                oldest_at, _ = next(iter(self._early_fills.values()))
+                if len(self._early_fills) <= _EARLY_FILL_CAP and now - oldest_at < _EARLY_FILL_TTL:
+                    break
+                self._early_fills.popitem(last=False)
+
+    def _apply_early_fills(self, order_ids: List[str]) -> None:
+        """Write parked fill prices for *order_ids*, whose trade rows are now committed."""
+        with self._fills_lock:
+            for order_id in order_ids:
+                parked = self._early_fills.pop(order_id, None)
+                if parked is not None:
+                    db.set_trade_entry_price(order_id, parked[1])
+
+    def _entry_price(self, order, estimate: Optional[float]) -> Optional[float]:
+        """
+        Actual fill price of *order* if already known — from the submit
+        response (immediate fills) or the trade stream — else *estimate*.
+        """
+        order_id = str(order.id)
+        with self._fills_lock:
+            parked = self._early_fills.pop(order_id, None)
+        if order.filled_avg_price:
+            return float(order.filled_avg_price)
+        return parked[1] if parked is not None else estimate
+
     # ── Stocks ─────────────────────────────────────────────────────────────────
 
-    def _execute_stock(self, signal: TradeSignal) -> bool:
-        ticker = _to_alpaca_stock_symbol(signal.ticker)
+    def _execute_stock(self, signal: TradeSignal, ticker: str) -> bool:
         direction = signal.direction  # "long" or "short"
 
-        price = self.get_current_price(signal.ticker, "stock")
+        if not self.is_tradable(ticker, AssetClass.US_EQUITY):
+            logger.warning("%s is not a tradable Alpaca stock — skipping", ticker)
+            return False
+
+        price = self.get_current_price(ticker, "stock")
         if price is None or price <= 0:
             logger.warning("Could not get price for %s — skipping", ticker)
             return False
@@ -221,49 +577,66 @@ class TradeExecutor:
             direction=direction,
             qty=float(qty),
             asset_type="stock",
+            known_price=price,  # just quoted above; no second lookup
         )
 
     def _submit_stock_order(
-        self, signal_id: int, ticker: str, direction: str, qty: float, asset_type: str
+        self,
+        signal_id: int,
+        ticker: str,
+        direction: str,
+        qty: float,
+        asset_type: str,
+        known_price: Optional[float] = None,
     ) -> bool:
-        side = OrderSide.BUY if direction == "long" else OrderSide.SELL
-
-        def _submit():
-            return self._trading.submit_order(
-                MarketOrderRequest(
-                    symbol=ticker,
-                    qty=qty,
-                    side=side,
-                    time_in_force=TimeInForce.DAY,
-                )
-            )
+        """Submit a market order and record the trade; see _place_stock_order()."""
+        trade_row = self._place_stock_order(
+            signal_id, ticker, direction, qty, asset_type, known_price
+        )
+        if trade_row is None:
+            return False
+        db.save_trade(*trade_row)
+        self._apply_early_fills([trade_row[1]])
+        return True
+
+    def _place_stock_order(
+        self,
+        signal_id: int,
+        ticker: str,
+        direction: str,
+        qty: float,
+        asset_type: str,
+        known_price: Optional[float] = None,
+    ) -> Optional[Tuple[Any, ...]]:
+        """
+        Submit a market order without touching the DB.  Returns the trade row
+        (the db.save_trade() arguments, in order) or None if the order failed.
+        *known_price*, if given, is recorded as the entry price.
+        """
+        side = _ORDER_SIDE.get(direction, OrderSide.SELL)
 
         try:
-            order = _retry(_submit, f"stock order {ticker}")
-            entry_price = self.get_current_price(ticker, asset_type) or 0.0
-            db.save_trade(
-                signal_id=signal_id,
-                alpaca_order_id=str(order.id),
-                ticker=ticker,
-                direction=direction,
-                asset_type=asset_type,
-                qty=qty,
-                entry_price=entry_price,
-                status="open",
-            )
-            logger.info(
-                "Stock order submitted ✓  %s %s x%.0f @ ~$%.2f  order_id=%s",
-                side.value.upper(), ticker, qty, entry_price, order.id,
-            )
-            return True
+            # Built (and validated) once, then reused by every retry; inside
+            # the try so a validation error is an ordinary order failure
+            order_req = _stock_market_order(symbol=ticker, qty=qty, side=side)
+            order = _retry(lambda: self._trading.submit_order(order_req), f"stock order {ticker}")
+            entry_price = self._entry_price(order, known_price)
+            if entry_price is None:
+                entry_price = self.get_current_price(ticker, asset_type) or 0.0
+            # Gated: at market open this runs once per queued order
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Stock order submitted ✓  %s %s x%.0f @ ~$%.2f  order_id=%s",
+                    _SIDE_LABEL[side], ticker, qty, entry_price, order.id,
+                )
+            return (signal_id, str(order.id), ticker, direction, asset_type, qty, entry_price, "open")
         except Exception as exc:
             logger.error("Stock order failed for %s: %s", ticker, exc, exc_info=True)
-            return False
+            return None
 
     # ── Crypto ──────────────────────────────────────────────────────────────────
 
-    def _execute_crypto(self, signal: TradeSignal) -> bool:
-        symbol = _to_alpaca_crypto_symbol(signal.ticker)
+    def _execute_crypto(self, signal: TradeSignal, symbol: str) -> bool:
         direction = signal.direction
 
         # Alpaca does not support short-selling crypto
@@ -274,6 +647,10 @@ class TradeExecutor:
             )
             return False
 
+        if not self.is_tradable(symbol, AssetClass.CRYPTO):
+            logger.warning("%s is not a tradable Alpaca crypto pair — skipping", symbol)
+            return False
+
         price = self.get_current_price(signal.ticker, "crypto")
         if price is None or price <= 0:
             logger.warning("Could not get price for %s — skipping", symbol)
@@ -283,18 +660,10 @@ class TradeExecutor:
         qty = round(self._max_usd / price, 6)
         qty = max(qty, 1e-6)
 
-        def _submit():
-            return self._trading.submit_order(
-                MarketOrderRequest(
-                    symbol=symbol,
-                    qty=qty,
-                    side=OrderSide.BUY,
-                    time_in_force=TimeInForce.GTC,
-                )
-            )
-
         try:
-            order = _retry(_submit, f"crypto order {symbol}")
+            order_req = _crypto_market_order(symbol=symbol, qty=qty)
+            order = _retry(lambda: self._trading.submit_order(order_req), f"crypto order {symbol}")
+            entry_price = self._entry_price(order, price)
             db.save_trade(
                 signal_id=signal.signal_id,
                 alpaca_order_id=str(order.id),
@@ -302,12 +671,13 @@ class TradeExecutor:
                 direction=direction,
                 asset_type="crypto",
                 qty=qty,
-                entry_price=price,
+                entry_price=entry_price,
                 status="open",
             )
+            self._apply_early_fills([str(order.id)])
             logger.info(
                 "Crypto order submitted ✓  BUY %s qty=%.6f @ ~$%.4f  order_id=%s",
-                symbol, qty, price, order.id,
+                symbol, qty, entry_price, order.id,
             )
             return True
         except Exception as exc:
@@ -316,7 +686,7 @@ class TradeExecutor:
 
     # ── Options ─────────────────────────────────────────────────────────────────
 
-    def _execute_option(self, signal: TradeSignal) -> bool:
+    def _execute_option(self, signal: TradeSignal, ticker: str) -> bool:
         """
         Attempt to place an options order via Alpaca.
 
@@ -325,28 +695,27 @@ class TradeExecutor:
         not available (account not approved or wrong SDK version) we log a
         clear message and return False rather than crashing.
         """
+        if not _OPTIONS_AVAILABLE:
+            logger.warning(
+                "Options not supported in this version of alpaca-py — skipping %s", signal.ticker
+            )
+            return False
         if signal.option_details is None:
             logger.warning("Option signal for %s has no option_details — skipping", signal.ticker)
             return False
 
         od = signal.option_details
-        ticker = _to_alpaca_stock_symbol(signal.ticker)
         contract_type = od.contract_type.upper()[0]  # "C" or "P"
 
-        # Build OCC option symbol: AAPL240315C00200000
         try:
-            expiry_compact = od.expiry.replace("-", "")[2:]  # "YYYYMMDD" → "YYMMDD"
-            strike_int = int(round(od.strike * 1000))
-            occ_symbol = f"{ticker}{expiry_compact}{contract_type}{strike_int:08d}"
-        except Exception as exc:
+            occ_symbol = _build_occ(ticker, od.expiry, contract_type, od.strike)
+        except ValueError as exc:
             logger.warning("Could not build OCC symbol for %s: %s", signal.ticker, exc)
             return False
 
-        side = OrderSide.BUY if signal.direction == "long" else OrderSide.SELL
+        side = _ORDER_SIDE.get(signal.direction, OrderSide.SELL)
 
         try:
-            from alpaca.trading.requests import OptionLegRequest, PlaceOptionOrderRequest  # type: ignore[import]
-
             order_req = PlaceOptionOrderRequest(
                 qty=1,
                 type="market",
@@ -364,18 +733,23 @@ class TradeExecutor:
                 direction=signal.direction,
                 asset_type="option",
                 qty=1.0,
-                entry_price=0.0,
+                entry_price=self._entry_price(order, 0.0),
                 status="open",
             )
+            self._apply_early_fills([str(order.id)])
             logger.info(
                 "Option order submitted ✓  %s %s  order_id=%s",
-                side.value.upper(), occ_symbol, order.id,
+                _SIDE_LABEL[side], occ_symbol, order.id,
             )
             return True
-        except ImportError:
-            logger.warning(
-                "Options not supported in this version of alpaca-py — skipping %s", occ_symbol
-            )
         except Exception as exc:
             logger.error("Option order failed for %s: %s", occ_symbol, exc, exc_info=True)
         return False
+
+    # asset_type -> (handler, symbol normaliser), looked up by execute().
+    # Options use the underlying's stock symbol; unknown types trade as stock.
+    _DISPATCH: Dict[str, Tuple[Callable[..., bool], Callable[[str], str]]] = {
+        "crypto": (_execute_crypto, _to_alpaca_crypto_symbol),
+        "option": (_execute_option, _to_alpaca_stock_symbol),
+        "stock": (_execute_stock, _to_alpaca_stock_symbol),
+    }